@@ -0,0 +1,38 @@
+"""add_cost_data_version_indexes
+
+Revision ID: a3b8d6f1c2e4
+Revises: f7a9c2d4e8b1
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b8d6f1c2e4'
+down_revision: Union[str, Sequence[str], None] = 'f7a9c2d4e8b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cost data version of a business (tech card cost caches) is read per request
+    op.create_index(
+        'ix_ingredient_cost_history_business_id_id',
+        'ingredient_cost_history',
+        ['business_id', 'id'],
+    )
+    op.create_index(
+        'ix_units_business_id_updated_at',
+        'units',
+        ['business_id', 'updated_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_units_business_id_updated_at', table_name='units')
+    op.drop_index('ix_ingredient_cost_history_business_id_id', table_name='ingredient_cost_history')
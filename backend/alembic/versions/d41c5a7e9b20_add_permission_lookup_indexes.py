@@ -0,0 +1,38 @@
+"""add_permission_lookup_indexes
+
+Revision ID: d41c5a7e9b20
+Revises: c7d350ee55a8
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c5a7e9b20'
+down_revision: Union[str, Sequence[str], None] = 'c7d350ee55a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Covering indexes for the single-query permission check (is_active included)
+    op.create_index(
+        'ix_user_perm_lookup',
+        'user_permissions',
+        ['user_id', 'permission_id', 'business_id', 'is_active'],
+    )
+    op.create_index(
+        'ix_role_perm_lookup',
+        'role_permissions',
+        ['role_id', 'permission_id', 'is_active'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_role_perm_lookup', table_name='role_permissions')
+    op.drop_index('ix_user_perm_lookup', table_name='user_permissions')
@@ -0,0 +1,44 @@
+"""unique_user_permission_per_business
+
+Revision ID: f7a9c2d4e8b1
+Revises: d41c5a7e9b20
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a9c2d4e8b1'
+down_revision: Union[str, Sequence[str], None] = 'd41c5a7e9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest row per user, permission and business before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM user_permissions
+        WHERE id NOT IN (
+            SELECT max(id) FROM user_permissions
+            GROUP BY user_id, permission_id, coalesce(business_id, 0)
+        )
+        """
+    )
+    # NULL business_id (global permission) is folded to 0 so it conflicts too
+    op.create_index(
+        'uq_user_permissions_user_permission_business',
+        'user_permissions',
+        ['user_id', 'permission_id', sa.text('coalesce(business_id, 0)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_user_permissions_user_permission_business', table_name='user_permissions')
@@ -151,10 +151,10 @@ async def refresh(
 @router.post("/logout")
 async def logout(
     db: AsyncSession = Depends(get_db_dep),
-    user_id: str = Depends(get_current_user_id)
+    user_id: int = Depends(get_current_user_id)
 ):
     """Logout user and clear refresh token."""
-    user = await db.scalar(select(User).where(User.id == int(user_id)))
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user:
         user.refresh_token = None
         user.refresh_token_expires = None
@@ -165,10 +165,10 @@ async def logout(
 @router.post("/revoke-all")
 async def revoke_all_sessions(
     db: AsyncSession = Depends(get_db_dep),
-    user_id: str = Depends(get_current_user_id)
+    user_id: int = Depends(get_current_user_id)
 ):
     """Revoke all refresh tokens for the current user (all sessions)."""
-    user = await db.scalar(select(User).where(User.id == int(user_id)))
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user:
         user.refresh_token = None
         user.refresh_token_expires = None
@@ -177,11 +177,11 @@ async def revoke_all_sessions(
     return {"message": "All sessions revoked successfully"}
 
 @router.get("/me", response_model=UserOut)
-async def me(user_id: str = Depends(get_current_user_id), db: AsyncSession = Depends(get_db_dep)):
+async def me(user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db_dep)):
     user = await db.scalar(
         select(User)
         .options(selectinload(User.role))
-        .where(User.id == int(user_id))
+        .where(User.id == user_id)
     )
     if not user:
         return JSONResponse(
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, Sequence
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, exists, or_, select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -297,23 +297,22 @@ class BusinessService:
         business_id: int,
     ) -> bool:
         """Check if user can manage business (owner or manager)."""
-        # Check if user is owner
-        business = await BusinessService.get_business_by_id(session, business_id)
-        if business and business.owner_id == user_id:
-            return True
-
-        # Check if user has manager role
-        result = await session.execute(
-            select(UserBusiness).where(
-                and_(
-                    UserBusiness.user_id == user_id,
-                    UserBusiness.business_id == business_id,
-                    UserBusiness.role_in_business.in_(["manager", "admin"]),
-                    UserBusiness.is_active,
-                )
+        # Owner and manager checks are fused into one round-trip
+        is_owner = exists().where(
+            and_(
+                Business.id == business_id,
+                Business.owner_id == user_id,
             )
         )
-        return result.scalars().first() is not None
+        is_manager = exists().where(
+            and_(
+                UserBusiness.user_id == user_id,
+                UserBusiness.business_id == business_id,
+                UserBusiness.role_in_business.in_(["manager", "admin"]),
+                UserBusiness.is_active,
+            )
+        )
+        return bool(await session.scalar(select(or_(is_owner, is_manager))))
 
     @staticmethod
     async def can_user_access_business(
@@ -0,0 +1,49 @@
+"""Simple in-memory TTL cache for sharing computed values across requests."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+
+# Sentinel returned by TTLCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+
+class TTLCache:
+    """In-memory LRU cache whose entries expire after a fixed time."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of entries kept (least recently used are evicted)
+            ttl_seconds: Time in seconds after which an entry is considered stale
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Return cached value for key, or MISSING if absent or expired."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return MISSING
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value for key, evicting the least recently used entry if full."""
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self.entries.clear()
@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = Field(..., alias="DATABASE_URL")
+    db_pool_size: int = Field(20, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(3600, alias="DB_POOL_RECYCLE")
+    db_statement_cache_size: int = Field(1024, alias="DB_STATEMENT_CACHE_SIZE")
+    db_query_cache_size: int = Field(1200, alias="DB_QUERY_CACHE_SIZE")
     
     # JWT
     jwt_secret: str = Field(..., alias="JWT_SECRET")
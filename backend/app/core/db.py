@@ -1,5 +1,6 @@
 """DB connection setup (SQLAlchemy + async)."""
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -11,8 +12,38 @@ class Base(DeclarativeBase):
     pass
 
 
+def _engine_options(database_url: str) -> dict[str, Any]:
+    """Pool and driver options for the configured database backend."""
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "query_cache_size": settings.db_query_cache_size,
+    }
+    url = make_url(database_url)
+
+    # SQLite (dev/tests) keeps SQLAlchemy's default pool for its driver
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if url.get_driver_name() == "asyncpg":
+        # Reuse prepared statements for repeated parameterized queries
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
 # Create SQLAlchemy engine
-engine = create_async_engine(settings.database_url, echo=settings.db_echo, future=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=settings.db_echo,
+    future=True,
+    **_engine_options(settings.database_url),
+)
 print("DB URL =", settings.database_url)
 
 # Session factory
@@ -1,18 +1,84 @@
 """Permission checking middleware and decorators."""
-from typing import Annotated
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Annotated, Iterator
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_, case, func, literal, literal_column, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.core_models import Permission, UserPermission
+from app.core.cache import TTLCache, MISSING
+from app.core_models import Permission, UserPermission, UserRole
 from app.deps import get_current_user_id, get_db_dep
 
+# Permission catalog {name: id}, small and only changed by seeds and migrations
+permission_ids_cache = TTLCache(max_size=1, ttl_seconds=300)
+
+# check_user_permission results of the current request by (user_id, permission_name, business_id),
+# None outside of permission_cache_scope
+_permission_cache: ContextVar[dict[tuple[int, str, int | None], bool] | None] = ContextVar(
+    "permission_cache", default=None
+)
+
+
+@contextmanager
+def permission_cache_scope() -> Iterator[None]:
+    """Memoize permission checks until the block exits (one request)."""
+    token = _permission_cache.set({})
+    try:
+        yield
+    finally:
+        _permission_cache.reset(token)
+
+
+class PermissionCacheMiddleware:
+    """ASGI middleware giving every HTTP request its own permission check cache."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with permission_cache_scope():
+            await self.app(scope, receive, send)
+
+
+def _invalidate_cached_permission(user_id: int, permission_name: str) -> None:
+    """Forget cached checks of a user's permission in every business context."""
+    cache = _permission_cache.get()
+    if cache:
+        for key in [key for key in cache if key[:2] == (user_id, permission_name)]:
+            del cache[key]
+
 
 async def check_user_permission(
     user_id: int,
     permission_name: str,
     db: AsyncSession,
     business_id: int | None = None
+) -> bool:
+    """Check if user has permission, reusing the result of the same check in this request.
+
+    See _check_user_permission for the rules.
+    """
+    cache = _permission_cache.get()
+    if cache is None:
+        return await _check_user_permission(user_id, permission_name, db, business_id)
+
+    key = (user_id, permission_name, business_id)
+    if key not in cache:
+        cache[key] = await _check_user_permission(user_id, permission_name, db, business_id)
+    return cache[key]
+
+
+async def _check_user_permission(
+    user_id: int,
+    permission_name: str,
+    db: AsyncSession,
+    business_id: int | None = None
 ) -> bool:
     """Check if user has permission either directly or through their role.
     
@@ -30,104 +96,111 @@ async def check_user_permission(
     Returns:
         True if user has permission, False otherwise
     """
-    # First, check for explicit denial (is_active=False)
-    # This takes precedence over role permissions
-    denial_query = select(UserPermission).join(Permission).where(
+    from app.core_models import Role, RolePermission, User, UserBusiness
+
+    # One UNION ALL of every matching grant, the row with the lowest priority decides:
+    # 0 - explicit user denial, 1 - user permission, 2 - role permission
+    user_grants = select(
+        UserPermission.is_active.label("granted"),
+        case((UserPermission.is_active, 1), else_=0).label("priority"),
+    ).join(Permission).where(
         UserPermission.user_id == user_id,
-        ~UserPermission.is_active,
-        Permission.name == permission_name
+        Permission.name == permission_name,
     )
-    
-    if business_id is not None:
-        denial_query = denial_query.where(
-            (UserPermission.business_id == business_id) | (UserPermission.business_id.is_(None))
-        )
-    
-    denial = await db.scalar(denial_query)
-    if denial:
-        # Explicit denial - user does NOT have permission
-        return False
-    
-    # Check for direct user permission (is_active=True)
-    user_permission_query = select(UserPermission).join(Permission).where(
-        UserPermission.user_id == user_id,
-        UserPermission.is_active,
-        Permission.name == permission_name
+
+    role_grants = select(
+        literal(True).label("granted"),
+        literal(2).label("priority"),
+    ).select_from(RolePermission).join(Permission).join(Role).where(
+        RolePermission.is_active,
+        Permission.name == permission_name,
     )
-    
+
     if business_id is not None:
-        user_permission_query = user_permission_query.where(
+        user_grants = user_grants.where(
             (UserPermission.business_id == business_id) | (UserPermission.business_id.is_(None))
         )
-    
-    user_permission = await db.scalar(user_permission_query)
-    if user_permission:
-        return True
-    
-    # Check for role-based permission (lowest priority)
-    from app.core_models import Role, RolePermission, User, UserBusiness
-    
-    # If business_id is provided, check the user's role in that specific business
-    if business_id is not None:
-        # Get user's role in the business through UserBusiness table
-        user_business = await db.scalar(
-            select(UserBusiness)
-            .where(
+
+        # Role comes from the user's active membership in the business.
+        # Map role_in_business (owner, employee, manager) to the system role name:
+        # owners get BUSINESS_OWNER permissions within their business,
+        # managers are treated as employees. Unknown roles match nothing - deny.
+        business_role_name = case(
+            (func.lower(UserBusiness.role_in_business) == "owner", UserRole.BUSINESS_OWNER.value),
+            (func.lower(UserBusiness.role_in_business).in_(["employee", "manager"]), UserRole.EMPLOYEE.value),
+        )
+        role_grants = role_grants.join(
+            UserBusiness,
+            and_(
                 UserBusiness.user_id == user_id,
                 UserBusiness.business_id == business_id,
-                UserBusiness.is_active
-            )
-        )
-        
-        if not user_business:
-            # User is not a member of this business
-            return False
-        
-        # Map role_in_business to system role name for permission checking
-        # role_in_business values: "owner", "employee", "manager" (lowercase)
-        # System roles: "BUSINESS_OWNER", "EMPLOYEE"
-        # 
-        # Logic: Owners in a business get BUSINESS_OWNER permissions within their business context.
-        # This allows business owners to manage their business.
-        role_name_mapping = {
-            "owner": "BUSINESS_OWNER",
-            "employee": "EMPLOYEE",
-            "manager": "EMPLOYEE",  # Manager treated as employee for permissions
-        }
-        
-        role_name = role_name_mapping.get(user_business.role_in_business.lower())
-        if not role_name:
-            # Unknown role - deny access
-            return False
-        
-        # Check if this role has the required permission
-        role_permission = await db.scalar(
-            select(RolePermission)
-            .join(Permission)
-            .join(Role)
-            .where(
-                Role.name == role_name,
-                RolePermission.is_active,
-                Permission.name == permission_name
-            )
+                UserBusiness.is_active,
+                Role.name == business_role_name,
+            ),
         )
-        
-        return role_permission is not None
     else:
         # No business context - use global user role
-        role_permission = await db.scalar(
-            select(RolePermission)
-            .join(Permission)
-            .join(Role)
-            .join(User, User.role_id == Role.id)
-            .where(
-                User.id == user_id,
-                RolePermission.is_active,
-                Permission.name == permission_name
-            )
-        )
-        
-        return role_permission is not None
+        role_grants = role_grants.join(User, User.role_id == Role.id).where(User.id == user_id)
+
+    grants = union_all(user_grants, role_grants).subquery()
+    granted = await db.scalar(
+        select(grants.c.granted).order_by(grants.c.priority).limit(1)
+    )
+    return bool(granted)
+
+
+async def get_permission_id(db: AsyncSession, permission_name: str) -> int | None:
+    """Return ID of the permission with given name, or None if there is no such permission."""
+    catalog = permission_ids_cache.get("catalog")
+    if catalog is MISSING:
+        rows = await db.execute(select(Permission.name, Permission.id))
+        catalog = {name: permission_id for name, permission_id in rows}
+        permission_ids_cache.set("catalog", catalog)
+    if permission_name not in catalog:
+        # Permission may have been added since the catalog was loaded (seed or migration in
+        # another process), look it up and remember it so repeated misses stay cheap
+        permission_id = await db.scalar(select(Permission.id).where(Permission.name == permission_name))
+        if permission_id is None:
+            return None
+        catalog = {**catalog, permission_name: permission_id}
+        permission_ids_cache.set("catalog", catalog)
+    return catalog[permission_name]
+
+
+def invalidate_permission_cache() -> None:
+    """Forget the permission catalog, call after adding or renaming permissions."""
+    permission_ids_cache.clear()
+
+
+async def _upsert_user_permission(
+    db: AsyncSession,
+    user_id: int,
+    permission_id: int,
+    business_id: int | None,
+    is_active: bool,
+) -> None:
+    """Insert or update a user permission row in one INSERT ... ON CONFLICT DO UPDATE."""
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(UserPermission).values(
+        user_id=user_id,
+        permission_id=permission_id,
+        business_id=business_id,
+        is_active=is_active,
+    )
+    stmt = stmt.on_conflict_do_update(
+        # Matches uq_user_permissions_user_permission_business
+        index_elements=[
+            UserPermission.user_id,
+            UserPermission.permission_id,
+            func.coalesce(UserPermission.business_id, literal_column("0")),
+        ],
+        set_={"is_active": stmt.excluded.is_active, "updated_at": stmt.excluded.updated_at},
+    )
+    # Refresh the row if this session already holds it
+    await db.scalars(
+        stmt.returning(UserPermission),
+        execution_options={"populate_existing": True},
+    )
 
 
 async def grant_user_permission(
@@ -148,35 +221,15 @@ async def grant_user_permission(
         True if permission was granted successfully, False otherwise
     """
     # Check if permission exists
-    permission = await db.scalar(
-        select(Permission).where(Permission.name == permission_name)
-    )
-    if not permission:
+    permission_id = await get_permission_id(db, permission_name)
+    if permission_id is None:
         return False
     
-    # Check if user permission already exists
-    existing_perm = await db.scalar(
-        select(UserPermission).where(
-            UserPermission.user_id == user_id,
-            UserPermission.permission_id == permission.id,
-            UserPermission.business_id == business_id
-        )
-    )
-    
-    if existing_perm:
-        # Update existing permission to active
-        existing_perm.is_active = True
-    else:
-        # Create new user permission
-        user_permission = UserPermission(
-            user_id=user_id,
-            permission_id=permission.id,
-            business_id=business_id,
-            is_active=True
-        )
-        db.add(user_permission)
+    # Create the user permission or re-activate the existing one
+    await _upsert_user_permission(db, user_id, permission_id, business_id, is_active=True)
     
     await db.commit()
+    _invalidate_cached_permission(user_id, permission_name)
     return True
 
 
@@ -201,36 +254,16 @@ async def revoke_user_permission(
         True if permission was revoked successfully, False otherwise
     """
     # Get permission
-    permission = await db.scalar(
-        select(Permission).where(Permission.name == permission_name)
-    )
-    if not permission:
+    permission_id = await get_permission_id(db, permission_name)
+    if permission_id is None:
         return False
     
-    # Find existing user permission
-    user_permission = await db.scalar(
-        select(UserPermission).where(
-            UserPermission.user_id == user_id,
-            UserPermission.permission_id == permission.id,
-            UserPermission.business_id == business_id
-        )
-    )
-    
-    if user_permission:
-        # Deactivate existing permission
-        user_permission.is_active = False
-    else:
-        # Create new user permission with is_active=False to explicitly deny
-        # This is needed when user has permission through role but we want to revoke it
-        user_permission = UserPermission(
-            user_id=user_id,
-            permission_id=permission.id,
-            business_id=business_id,
-            is_active=False
-        )
-        db.add(user_permission)
+    # Deactivate existing permission, or create it with is_active=False to explicitly deny.
+    # The denial is needed when user has permission through role but we want to revoke it
+    await _upsert_user_permission(db, user_id, permission_id, business_id, is_active=False)
     
     await db.commit()
+    _invalidate_cached_permission(user_id, permission_name)
     return True
 
 
@@ -243,12 +276,12 @@ class PermissionChecker:
     
     async def __call__(
         self,
-        user_id: Annotated[str, Depends(get_current_user_id)],
+        user_id: Annotated[int, Depends(get_current_user_id)],
         db: Annotated[AsyncSession, Depends(get_db_dep)]
     ) -> bool:
         """Check if current user has required permission."""
         has_permission = await check_user_permission(
-            user_id=int(user_id), 
+            user_id=user_id,
             permission_name=self.permission_name, 
             db=db
         )
@@ -277,12 +310,12 @@ class BusinessPermissionChecker:
     async def __call__(
         self,
         business_id: int,
-        user_id: Annotated[str, Depends(get_current_user_id)],
+        user_id: Annotated[int, Depends(get_current_user_id)],
         db: Annotated[AsyncSession, Depends(get_db_dep)]
     ) -> bool:
         """Check if current user has required permission for specific business."""
         has_permission = await check_user_permission(
-            user_id=int(user_id), 
+            user_id=user_id,
             permission_name=self.permission_name, 
             db=db,
             business_id=business_id
@@ -102,7 +102,7 @@ class ResourcePermissionChecker:
     async def __call__(
         self,
         request: Request,
-        user_id: Annotated[str, Depends(get_current_user_id)],
+        user_id: Annotated[int, Depends(get_current_user_id)],
         db: Annotated[AsyncSession, Depends(get_db_dep)],
     ) -> dict:
         """
@@ -111,8 +111,6 @@ class ResourcePermissionChecker:
         Returns:
             dict with user_id and business_id for use in endpoint
         """
-        user_id_int = int(user_id)
-        
         # Extract business_id
         business_id = None
         if self.business_id_extractor:
@@ -124,7 +122,7 @@ class ResourcePermissionChecker:
         if business_id and not self.skip_business_check:
             has_access = await BusinessService.can_user_access_business(
                 session=db,
-                user_id=user_id_int,
+                user_id=user_id,
                 business_id=business_id,
             )
             if not has_access:
@@ -138,7 +136,7 @@ class ResourcePermissionChecker:
         
         # Check resource permission
         has_permission = await check_user_permission(
-            user_id=user_id_int,
+            user_id=user_id,
             permission_name=self.permission_name,
             db=db,
             business_id=business_id,
@@ -165,7 +163,7 @@ class ResourcePermissionChecker:
             )
         
         return {
-            "user_id": user_id_int,
+            "user_id": user_id,
             "business_id": business_id,
         }
 
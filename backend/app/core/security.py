@@ -1,8 +1,10 @@
 """Security utils (JWT, password hashing)."""
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Optional
 
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
 from passlib.context import CryptContext  # type: ignore
 
 from app.core.config import settings
@@ -15,6 +17,14 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+@lru_cache(maxsize=4)
+def _jwt_key(secret: str, algorithm: str) -> Key:
+    """
+    Key object for the JWT secret, prepared once.
+    Given the raw secret, jose re-parses it and builds the key on every encode/decode.
+    """
+    return jwk.construct(secret, algorithm)
+
 def create_access_token(
     subject: str | int,
     expires_minutes: Optional[int] = None,
@@ -25,7 +35,7 @@ def create_access_token(
     payload = {"sub": str(subject), "iat": int(now.timestamp()), "exp": int(expire.timestamp())}
     if extra_claims:
         payload.update(extra_claims)
-    token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
+    token = jwt.encode(payload, _jwt_key(settings.jwt_secret, settings.jwt_alg), algorithm=settings.jwt_alg)
     return token
 
 def create_refresh_token(
@@ -41,11 +51,11 @@ def create_refresh_token(
         "exp": int(expire.timestamp()),
         "type": "refresh"  # Mark as refresh token
     }
-    token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
+    token = jwt.encode(payload, _jwt_key(settings.jwt_secret, settings.jwt_alg), algorithm=settings.jwt_alg)
     return token
 
 def decode_token(token: str) -> dict[str, Any]:
     try:
-        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
+        return jwt.decode(token, _jwt_key(settings.jwt_secret, settings.jwt_alg), algorithms=[settings.jwt_alg])
     except JWTError as e:
         raise ValueError("Invalid token") from e
\ No newline at end of file
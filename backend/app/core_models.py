@@ -1,6 +1,6 @@
 """Core models for user management and access control."""
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import String, ForeignKey, DateTime, Boolean, Text, Index, text
 from datetime import datetime
 from enum import Enum as PyEnum
 from app.core.db import Base
@@ -66,6 +66,10 @@ class Permission(Base):
 
 class RolePermission(Base):
     __tablename__ = "role_permissions"
+    __table_args__ = (
+        # Covers permission checks by role and permission
+        Index("ix_role_perm_lookup", "role_id", "permission_id", "is_active"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"), nullable=False)
@@ -81,6 +85,16 @@ class RolePermission(Base):
 
 class UserPermission(Base):
     __tablename__ = "user_permissions"
+    __table_args__ = (
+        # Covers permission checks, grants and revokes by user, permission and business
+        Index("ix_user_perm_lookup", "user_id", "permission_id", "business_id", "is_active"),
+        # One row per user, permission and business (NULL business is global), upsert target
+        Index(
+            "uq_user_permissions_user_permission_business",
+            "user_id", "permission_id", text("coalesce(business_id, 0)"),
+            unique=True,
+        ),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
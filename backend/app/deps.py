@@ -1,11 +1,13 @@
 """Dependency injection stubs (DB, auth, etc)."""
+import time
 from datetime import datetime, timezone
 from fastapi import Depends, HTTPException, status, Path
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
+from app.core.cache import TTLCache, MISSING
 from app.core.db import get_db
 from app.core.security import decode_token
 from app.core.error_codes import ErrorCode, create_error_response
@@ -16,28 +18,50 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # Login endpoint f
 async def get_db_dep(db: AsyncSession = Depends(get_db)) -> AsyncSession:
     return db
 
-async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+# (user ID, exp) of verified access tokens, skips signature checks for repeated requests
+token_subject_cache = TTLCache(max_size=4096, ttl_seconds=60)
+
+# Our access tokens are well below this, longer input is rejected without parsing
+MAX_TOKEN_LENGTH = 4096
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, 
+        detail=create_error_response(ErrorCode.UNAUTHORIZED)
+    )
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    # A JWT is three dot-separated parts, anything else cannot verify
+    if not token or len(token) > MAX_TOKEN_LENGTH or token.count(".") != 2:
+        raise _unauthorized()
+
+    cached = token_subject_cache.get(token)
+    if cached is not MISSING:
+        user_id, exp = cached
+        if exp is None or exp > time.time():
+            return user_id
+
     try:
         payload = decode_token(token)
         sub = payload.get("sub")
         if not sub:
             raise ValueError("No subject in token")
-        return sub
+        user_id = int(sub)  # Subject is the user ID
+        token_subject_cache.set(token, (user_id, payload.get("exp")))
+        return user_id
     except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail=create_error_response(ErrorCode.UNAUTHORIZED)
-        )
+        raise _unauthorized()
 
 async def get_current_user(
-    user_id: str = Depends(get_current_user_id),
+    user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db_dep)
 ) -> User:
     """Get current authenticated user and clean up expired refresh tokens."""
+    # Role guards read user.role, load it in the same query (many-to-one, never NULL)
     user = await db.scalar(
         select(User)
-        .options(selectinload(User.role))
-        .where(User.id == int(user_id))
+        .options(joinedload(User.role, innerjoin=True))
+        .where(User.id == user_id)
     )
     if not user:
         raise HTTPException(
@@ -55,10 +79,17 @@ async def get_current_user(
     return user
 
 
+# Role names allowed by each role guard
+NON_BUYER_ROLES = frozenset({UserRole.ADMIN.value, UserRole.BUSINESS_OWNER.value})
+BUSINESS_OWNER_ROLES = frozenset({UserRole.BUSINESS_OWNER.value})
+ADMIN_ROLES = frozenset({UserRole.ADMIN.value})
+ADMIN_OR_BUSINESS_OWNER_ROLES = frozenset({UserRole.ADMIN.value, UserRole.BUSINESS_OWNER.value})
+
+
 def require_non_buyer_role(current_user: User = Depends(get_current_user)) -> User:
     """Require user to have BUSINESS_OWNER or ADMIN role (any role except EMPLOYEE)."""
     
-    if current_user.role.name == UserRole.EMPLOYEE.value:
+    if current_user.role.name not in NON_BUYER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=create_error_response(ErrorCode.BUYERS_NOT_ALLOWED)
@@ -69,7 +100,7 @@ def require_non_buyer_role(current_user: User = Depends(get_current_user)) -> Us
 def require_business_owner_role(current_user: User = Depends(get_current_user)) -> User:
     """Require user to have BUSINESS_OWNER role."""
     
-    if current_user.role.name != UserRole.BUSINESS_OWNER.value:
+    if current_user.role.name not in BUSINESS_OWNER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=create_error_response(ErrorCode.SUPPLIERS_ONLY)
@@ -80,7 +111,7 @@ def require_business_owner_role(current_user: User = Depends(get_current_user))
 def require_admin_role(current_user: User = Depends(get_current_user)) -> User:
     """Require user to have ADMIN role."""
     
-    if current_user.role.name != UserRole.ADMIN.value:
+    if current_user.role.name not in ADMIN_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=create_error_response(ErrorCode.ADMIN_ONLY)
@@ -91,7 +122,7 @@ def require_admin_role(current_user: User = Depends(get_current_user)) -> User:
 def require_admin_or_business_owner_role(current_user: User = Depends(get_current_user)) -> User:
     """Require user to have ADMIN or BUSINESS_OWNER role."""
     
-    if current_user.role.name not in [UserRole.ADMIN.value, UserRole.BUSINESS_OWNER.value]:
+    if current_user.role.name not in ADMIN_OR_BUSINESS_OWNER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=create_error_response(ErrorCode.SUPPLIERS_ONLY)
@@ -65,6 +65,7 @@ class InventoryTrackingService:
         units_result = await session.execute(units_stmt)
         units = units_result.scalars().all()
         units_map: dict[int, str] = {cast(int, unit.id): cast(str, unit.symbol) for unit in units}
+        units_by_id: dict[int, Unit] = {cast(int, unit.id): unit for unit in units}
 
         # 3. Load ALL invoices for the month (PENDING and PAID)
         invoices_stmt = (
@@ -130,7 +131,8 @@ class InventoryTrackingService:
                                 session, 
                                 item_qty, 
                                 item_unit_id, 
-                                category_unit_id
+                                category_unit_id,
+                                units=units_by_id,
                             )
                             if converted_result is not None and not error:
                                 qty_to_use = converted_result
@@ -3,7 +3,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, JSON, Index
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -19,6 +19,10 @@ class UnitType(str, Enum):
 class Unit(Base):
     """Measurement units for inventory tracking."""
     __tablename__ = "units"
+    __table_args__ = (
+        # Units version (count and last edit per business) read from the index alone
+        Index("ix_units_business_id_updated_at", "business_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)  # "Килограмм", "Литр", "Штука"
@@ -1,6 +1,6 @@
 """Service for managing measurement units and conversions."""
 
-from typing import List, Optional, Dict, Tuple
+from typing import Hashable, List, Optional, Dict, Tuple
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,10 +8,16 @@ from sqlalchemy.future import select
 from sqlalchemy import and_, func
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import TTLCache, MISSING
 from app.expenses.models import Unit
 from app.expenses.schemas import UnitCreate, UnitUpdate
 
 
+# Base factors (or error) of unit pairs, keyed by (from_unit_id, to_unit_id, units_version).
+# The caller's units version changes with any unit edit of the business, in every worker.
+conversion_factor_cache = TTLCache(max_size=1024, ttl_seconds=300)
+
+
 class UnitService:
     """Service for managing measurement units with conversion factors."""
 
@@ -75,6 +81,15 @@ class UnitService:
         result = await session.execute(query)
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_units_map(
+        session: AsyncSession,
+        business_id: int,
+    ) -> Dict[int, Unit]:
+        """Get all units of a business (inactive included) by ID, for resolving conversions in memory."""
+        result = await session.execute(select(Unit).where(Unit.business_id == business_id))
+        return {unit.id: unit for unit in result.scalars().all()}
+
     @staticmethod
     async def search_units(
         session: AsyncSession,
@@ -237,17 +252,61 @@ class UnitService:
         quantity: Decimal,
         from_unit_id: int,
         to_unit_id: int,
+        units: Optional[Dict[int, Unit]] = None,
+        units_version: Optional[Hashable] = None,
     ) -> Tuple[Optional[Decimal], str]:
         """
         Convert quantity from one unit to another.
+        Units of uncached conversions are taken from `units` ({unit_id: Unit}) when
+        given, otherwise they are loaded through the session. Factors are cached only
+        under a `units_version` that changes with every unit edit of the business.
         Returns (converted_quantity, error_message).
         """
         if from_unit_id == to_unit_id:
             return quantity, ""
-            
+
+        cache_key = (from_unit_id, to_unit_id, units_version)
+        cached = conversion_factor_cache.get(cache_key) if units_version is not None else MISSING
+        if cached is MISSING:
+            cached = await UnitService._get_pair_base_factors(
+                session, from_unit_id, to_unit_id, units
+            )
+            if units_version is not None:
+                conversion_factor_cache.set(cache_key, cached)
+        factors, error = cached
+        if factors is None:
+            return None, error
+        from_base_factor, to_base_factor = factors
+
+        # Convert: from_unit -> base_unit -> to_unit
+        # quantity_in_base = quantity * from_base_factor
+        # converted_quantity = quantity_in_base / to_base_factor
+        converted_quantity = (quantity * from_base_factor) / to_base_factor
+        
+        return converted_quantity, ""
+
+    @staticmethod
+    def is_conversion_cached(from_unit_id: int, to_unit_id: int, units_version: Hashable) -> bool:
+        """Whether converting between the units at this units version needs no unit lookups."""
+        return (
+            from_unit_id == to_unit_id
+            or conversion_factor_cache.get((from_unit_id, to_unit_id, units_version)) is not MISSING
+        )
+
+    @staticmethod
+    async def _get_pair_base_factors(
+        session: AsyncSession,
+        from_unit_id: int,
+        to_unit_id: int,
+        units: Optional[Dict[int, Unit]] = None,
+    ) -> Tuple[Optional[Tuple[Decimal, Decimal]], str]:
+        """
+        Get base conversion factors of both units of a conversion.
+        Returns ((from_base_factor, to_base_factor), error_message).
+        """
         # Get both units
-        from_unit = await UnitService.get_unit_by_id(session, from_unit_id)
-        to_unit = await UnitService.get_unit_by_id(session, to_unit_id)
+        from_unit = await UnitService._get_conversion_unit(session, from_unit_id, units)
+        to_unit = await UnitService._get_conversion_unit(session, to_unit_id, units)
         
         if not from_unit:
             return None, f"Source unit {from_unit_id} not found"
@@ -259,25 +318,36 @@ class UnitService:
             return None, f"Cannot convert between different unit types: {from_unit.unit_type} -> {to_unit.unit_type}"
             
         # Get conversion path to base unit for both units
-        from_base_factor = await UnitService._get_base_conversion_factor(session, from_unit)
-        to_base_factor = await UnitService._get_base_conversion_factor(session, to_unit)
+        from_base_factor = await UnitService._get_base_conversion_factor(session, from_unit, units)
+        to_base_factor = await UnitService._get_base_conversion_factor(session, to_unit, units)
         
         if from_base_factor is None:
             return None, f"Cannot determine base conversion for unit {from_unit.name}"
         if to_base_factor is None:
             return None, f"Cannot determine base conversion for unit {to_unit.name}"
-            
-        # Convert: from_unit -> base_unit -> to_unit
-        # quantity_in_base = quantity * from_base_factor
-        # converted_quantity = quantity_in_base / to_base_factor
-        converted_quantity = (quantity * from_base_factor) / to_base_factor
-        
-        return converted_quantity, ""
+
+        return (from_base_factor, to_base_factor), ""
+
+    @staticmethod
+    async def _get_conversion_unit(
+        session: AsyncSession,
+        unit_id: int,
+        units: Optional[Dict[int, Unit]] = None,
+    ) -> Optional[Unit]:
+        """
+        Get active unit for conversion, from `units` when given.
+        Otherwise units already loaded in the session are reused without a query.
+        """
+        unit = units.get(unit_id) if units is not None else await session.get(Unit, unit_id)
+        if not unit or not unit.is_active:
+            return None
+        return unit
 
     @staticmethod
     async def _get_base_conversion_factor(
         session: AsyncSession,
         unit: Unit,
+        units: Optional[Dict[int, Unit]] = None,
     ) -> Optional[Decimal]:
         """
         Get the conversion factor to convert from this unit to its base unit.
@@ -301,9 +371,10 @@ class UnitService:
             total_factor *= getattr(current_unit, 'conversion_factor')
             
             # Get the parent unit
-            parent_unit = await UnitService.get_unit_by_id(
+            parent_unit = await UnitService._get_conversion_unit(
                 session, 
-                getattr(current_unit, 'base_unit_id')
+                getattr(current_unit, 'base_unit_id'),
+                units,
             )
             if not parent_unit:
                 return None
@@ -17,6 +17,7 @@ from app.expenses.inventory_tracking_router import router as inventory_tracking_
 from app.tech_cards.router import router as tech_cards_router
 from app.core.db import engine
 from app.core.config import settings
+from app.core.permissions import PermissionCacheMiddleware
 from app.core_models import Base
 
 app = FastAPI(
@@ -35,6 +36,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PermissionCacheMiddleware)
 
 # Custom exception handler to flatten error response structure
 @app.exception_handler(HTTPException)
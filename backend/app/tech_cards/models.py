@@ -5,7 +5,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Numeric, Date
+from sqlalchemy import String, DateTime, Boolean, ForeignKey, Numeric, Date, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -69,6 +69,12 @@ class TechCardItemIngredient(Base):
 class IngredientCostHistory(Base):
     """Historical cost data for ingredients from invoices."""
     __tablename__ = "ingredient_cost_history"
+    __table_args__ = (
+        # Cost data version (row count and max id per business) read from the index alone
+        Index("ix_ingredient_cost_history_business_id_id", "business_id", "id"),
+        # Ids are never reused, so a re-synced invoice always moves max id (SQLite only)
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     category_id: Mapped[int] = mapped_column(ForeignKey("expense_categories.id", ondelete="CASCADE"), nullable=False, index=True)
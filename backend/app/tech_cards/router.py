@@ -1,20 +1,24 @@
 """Technology Card API router."""
 
+import hashlib
 from typing import Optional
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.permissions import PermissionChecker
 from app.deps import get_current_user, get_db_dep
 from app.core_models import User
 from app.businesses.service import BusinessService
+from app.tech_cards.models import TechCardItem
 from app.tech_cards.service import TechCardService, IngredientCostService
 from app.tech_cards.schemas import (
     TechCardItemCreate,
     TechCardItemUpdate,
+    TechCardItemIngredientOut,
     TechCardItemOut,
+    TechCardItemListRow,
     TechCardItemListOut,
     TechCardItemApprovalUpdate,
     IngredientCostSummary,
@@ -23,6 +27,62 @@ from app.core.error_codes import ErrorCode
 
 router = APIRouter()
 
+# ORM columns copied into list and item rows as-is (already valid, so validation is skipped)
+_LIST_ROW_COLUMNS = (
+    "id",
+    "business_id",
+    "name",
+    "description",
+    "selling_price",
+    "is_active",
+    "approval_status",
+    "approved_by",
+    "approved_at",
+    "created_by",
+    "created_at",
+    "updated_at",
+)
+
+# ORM columns copied into ingredient rows of item responses
+_INGREDIENT_COLUMNS = (
+    "id",
+    "item_id",
+    "ingredient_category_id",
+    "quantity",
+    "unit_id",
+    "notes",
+    "sort_order",
+    "created_at",
+)
+
+
+async def require_business_access(
+    business_id: int,
+    session: AsyncSession = Depends(get_db_dep),
+    current_user: User = Depends(get_current_user),
+) -> int:
+    """Ensure current user can manage the business from the URL path.
+
+    FastAPI caches dependency results per request, so routes that combine this
+    with other dependencies run the access query only once.
+    """
+    has_access = await BusinessService.can_user_manage_business(
+        session=session,
+        user_id=current_user.id,
+        business_id=business_id,
+    )
+    if not has_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this business",
+        )
+    return business_id
+
+
+def _to_cents(amount: Decimal) -> int:
+    """Round money amount to integer cents (half-up)."""
+    return int(amount.scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
 
 def calculate_profitability(
     selling_price: Decimal, 
@@ -32,17 +92,59 @@ def calculate_profitability(
     
     Returns tuple of (total_cost, profit_margin, profit_percentage).
     Formula: (selling_price / cost) * 100
+    
+    The margin is computed in integer cents and converted back to Decimal
+    only for the response; the percentage uses floats on the unrounded
+    cost so small costs keep their precision.
     """
-    if cost is None or selling_price <= 0:
+    if cost is None:
+        return cost, None, None
+    
+    selling_cents = _to_cents(selling_price)
+    if selling_cents <= 0:
         return cost, None, None
     
-    profit_margin = selling_price - cost
-    profit_percentage = float((selling_price / cost) * 100) if cost > 0 else None
+    profit_margin = Decimal(selling_cents - _to_cents(cost)).scaleb(-2)
+    cost_float = float(cost)
+    profit_percentage = float(selling_price) / cost_float * 100 if cost_float > 0 else None
     
     return cost, profit_margin, profit_percentage
 
 
-@router.post("/business/{business_id}/items", response_model=TechCardItemOut, status_code=status.HTTP_201_CREATED)
+def _build_item_out(item: TechCardItem) -> TechCardItemOut:
+    """Build item response from a loaded ORM item without re-validating it."""
+    return TechCardItemOut.model_construct(
+        **{column: getattr(item, column) for column in _LIST_ROW_COLUMNS},
+        ingredients=[
+            TechCardItemIngredientOut.model_construct(
+                **{column: getattr(ingredient, column) for column in _INGREDIENT_COLUMNS}
+            )
+            for ingredient in item.ingredients
+        ],
+    )
+
+
+def _item_etag(item: TechCardItem, cost: Optional[Decimal]) -> str:
+    """Weak ETag of item detail; covers item edits and ingredient cost changes."""
+    digest = hashlib.sha1(f"{item.updated_at.isoformat()}|{cost}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _attach_cost(response: TechCardItemListRow, cost: Optional[Decimal]) -> None:
+    """Fill cost and profitability fields of a tech card response in place."""
+    (
+        response.total_ingredient_cost,
+        response.profit_margin,
+        response.profit_percentage,
+    ) = calculate_profitability(response.selling_price, cost)
+
+
+@router.post(
+    "/business/{business_id}/items",
+    response_model=TechCardItemOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_business_access)],
+)
 async def create_tech_card_item(
     business_id: int,
     item_data: TechCardItemCreate,
@@ -53,18 +155,6 @@ async def create_tech_card_item(
     ),
 ):
     """Create a new technology card item (product recipe)."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     # Create item
     item = await TechCardService.create_tech_card_item(
         session=session,
@@ -74,22 +164,25 @@ async def create_tech_card_item(
     )
 
     # Build response
-    response = TechCardItemOut.model_validate(item)
+    response = _build_item_out(item)
     
     # Calculate cost (optional, for response)
     cost = await TechCardService.calculate_item_cost(
         session=session,
         item_id=response.id,
         business_id=business_id,
+        item=item,
     )
-    response.total_ingredient_cost, response.profit_margin, response.profit_percentage = calculate_profitability(
-        response.selling_price, cost
-    )
+    _attach_cost(response, cost)
 
     return response
 
 
-@router.get("/business/{business_id}/items", response_model=TechCardItemListOut)
+@router.get(
+    "/business/{business_id}/items",
+    response_model=TechCardItemListOut,
+    dependencies=[Depends(require_business_access)],
+)
 async def list_tech_card_items(
     business_id: int,
     page: int = Query(1, ge=1, description="Page number"),
@@ -97,24 +190,11 @@ async def list_tech_card_items(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     approval_status: Optional[str] = Query(None, description="Filter by approval status"),
     session: AsyncSession = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user),
     _: None = Depends(
         PermissionChecker(permission_name="view_tech_card_items")
     ),
 ):
     """List technology card items with filters."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     items, total = await TechCardService.list_tech_card_items(
         session=session,
         business_id=business_id,
@@ -125,18 +205,17 @@ async def list_tech_card_items(
     )
 
     # Build response with costs
+    costs = await TechCardService.calculate_items_costs(
+        session=session,
+        items=items,
+        business_id=business_id,
+    )
     items_out = []
     for item in items:
-        item_out = TechCardItemOut.model_validate(item)
-        
-        cost = await TechCardService.calculate_item_cost(
-            session=session,
-            item_id=item_out.id,
-            business_id=business_id,
-        )
-        item_out.total_ingredient_cost, item_out.profit_margin, item_out.profit_percentage = calculate_profitability(
-            item_out.selling_price, cost
+        item_out = TechCardItemListRow.model_construct(
+            **{column: getattr(item, column) for column in _LIST_ROW_COLUMNS}
         )
+        _attach_cost(item_out, costs[item.id])
 
         items_out.append(item_out)
 
@@ -148,29 +227,26 @@ async def list_tech_card_items(
     )
 
 
-@router.get("/business/{business_id}/items/{item_id}", response_model=TechCardItemOut)
+@router.get(
+    "/business/{business_id}/items/{item_id}",
+    response_model=TechCardItemOut,
+    dependencies=[Depends(require_business_access)],
+)
 async def get_tech_card_item(
     business_id: int,
     item_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user),
     _: None = Depends(
         PermissionChecker(permission_name="view_tech_card_items")
     ),
 ):
-    """Get technology card item by ID."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
+    """Get technology card item by ID.
 
+    Supports conditional requests: responds 304 Not Modified when the
+    If-None-Match header matches the current ETag.
+    """
     item = await TechCardService.get_tech_card_item(
         session=session,
         item_id=item_id,
@@ -183,46 +259,44 @@ async def get_tech_card_item(
             detail={"code": ErrorCode.NOT_FOUND, "message": "Tech card item not found"},
         )
 
-    # Build response
-    response = TechCardItemOut.model_validate(item)
-
-    # Calculate cost
+    # Calculate cost (usually served from cache) - it is part of the ETag
     cost = await TechCardService.calculate_item_cost(
         session=session,
-        item_id=response.id,
+        item_id=item.id,
         business_id=business_id,
-    )
-    response.total_ingredient_cost, response.profit_margin, response.profit_percentage = calculate_profitability(
-        response.selling_price, cost
+        item=item,
     )
 
-    return response
+    # Clients must revalidate, since costs change with new invoices
+    etag = _item_etag(item, cost)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    response.headers.update(cache_headers)
 
+    # Build response
+    item_out = _build_item_out(item)
+    _attach_cost(item_out, cost)
 
-@router.put("/business/{business_id}/items/{item_id}", response_model=TechCardItemOut)
+    return item_out
+
+
+@router.put(
+    "/business/{business_id}/items/{item_id}",
+    response_model=TechCardItemOut,
+    dependencies=[Depends(require_business_access)],
+)
 async def update_tech_card_item(
     business_id: int,
     item_id: int,
     update_data: TechCardItemUpdate,
     session: AsyncSession = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user),
     _: None = Depends(
         PermissionChecker(permission_name="edit_tech_card_items")
     ),
 ):
     """Update technology card item."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     item = await TechCardService.update_tech_card_item(
         session=session,
         item_id=item_id,
@@ -237,44 +311,34 @@ async def update_tech_card_item(
         )
 
     # Build response
-    response = TechCardItemOut.model_validate(item)
+    response = _build_item_out(item)
     
     # Calculate cost
     cost = await TechCardService.calculate_item_cost(
         session=session,
         item_id=response.id,
         business_id=business_id,
+        item=item,
     )
-    response.total_ingredient_cost, response.profit_margin, response.profit_percentage = calculate_profitability(
-        response.selling_price, cost
-    )
+    _attach_cost(response, cost)
 
     return response
 
 
-@router.delete("/business/{business_id}/items/{item_id}", status_code=204)
+@router.delete(
+    "/business/{business_id}/items/{item_id}",
+    status_code=204,
+    dependencies=[Depends(require_business_access)],
+)
 async def delete_tech_card_item(
     business_id: int,
     item_id: int,
     session: AsyncSession = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user),
     _: None = Depends(
         PermissionChecker(permission_name="delete_tech_card_items")
     ),
 ):
     """Delete technology card item."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     success = await TechCardService.delete_tech_card_item(
         session=session,
         item_id=item_id,
@@ -288,7 +352,11 @@ async def delete_tech_card_item(
         )
 
 
-@router.post("/business/{business_id}/items/{item_id}/approval", response_model=TechCardItemOut)
+@router.post(
+    "/business/{business_id}/items/{item_id}/approval",
+    response_model=TechCardItemOut,
+    dependencies=[Depends(require_business_access)],
+)
 async def update_tech_card_approval(
     business_id: int,
     item_id: int,
@@ -300,18 +368,6 @@ async def update_tech_card_approval(
     ),
 ):
     """Approve or reject technology card item."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     item = await TechCardService.update_approval_status(
         session=session,
         item_id=item_id,
@@ -327,44 +383,34 @@ async def update_tech_card_approval(
         )
 
     # Build response
-    response = TechCardItemOut.model_validate(item)
+    response = _build_item_out(item)
     
     # Calculate cost
     cost = await TechCardService.calculate_item_cost(
         session=session,
         item_id=response.id,
         business_id=business_id,
+        item=item,
     )
-    response.total_ingredient_cost, response.profit_margin, response.profit_percentage = calculate_profitability(
-        response.selling_price, cost
-    )
+    _attach_cost(response, cost)
 
     return response
 
 
-@router.get("/business/{business_id}/ingredients/{category_id}/cost", response_model=IngredientCostSummary)
+@router.get(
+    "/business/{business_id}/ingredients/{category_id}/cost",
+    response_model=IngredientCostSummary,
+    dependencies=[Depends(require_business_access)],
+)
 async def get_ingredient_cost_summary(
     business_id: int,
     category_id: int,
     session: AsyncSession = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user),
     _: None = Depends(
         PermissionChecker(permission_name="view_tech_card_items")
     ),
 ):
     """Get cost summary for an ingredient category."""
-    # Check if user has access to business
-    has_access = await BusinessService.can_user_manage_business(
-        session=session,
-        user_id=current_user.id,
-        business_id=business_id,
-    )
-    if not has_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this business",
-        )
-
     summary = await IngredientCostService.get_ingredient_cost_summary(
         session=session,
         business_id=business_id,
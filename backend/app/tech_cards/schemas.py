@@ -34,6 +34,7 @@ class TechCardItemIngredientUpdate(BaseModel):
 
 class TechCardItemIngredientOut(TechCardItemIngredientBase):
     """Schema for tech card item ingredient output."""
+    quantity: Decimal  # Server-authored, input constraints not re-checked
     id: int
     item_id: int
     created_at: datetime
@@ -71,8 +72,9 @@ class TechCardItemUpdate(BaseModel):
     ingredients: Optional[list[TechCardItemIngredientCreate]] = None
 
 
-class TechCardItemOut(TechCardItemBase):
-    """Schema for tech card item output."""
+class TechCardItemListRow(TechCardItemBase):
+    """Schema for tech card item in list output (without nested ingredients)."""
+    selling_price: Decimal  # Server-authored, input constraints not re-checked
     id: int
     business_id: int
     approval_status: str
@@ -82,8 +84,6 @@ class TechCardItemOut(TechCardItemBase):
     created_at: datetime
     updated_at: datetime
     
-    # Nested data
-    ingredients: list[TechCardItemIngredientOut] = Field(default_factory=list)
     total_ingredient_cost: Optional[Decimal] = None  # Sum of all ingredient costs
     profit_margin: Optional[Decimal] = None  # selling_price - total_ingredient_cost
     profit_percentage: Optional[float] = None  # (selling_price / total_ingredient_cost) * 100 - рентабельность
@@ -94,9 +94,15 @@ class TechCardItemOut(TechCardItemBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TechCardItemOut(TechCardItemListRow):
+    """Schema for tech card item output."""
+    # Nested data
+    ingredients: list[TechCardItemIngredientOut] = Field(default_factory=list)
+
+
 class TechCardItemListOut(BaseModel):
     """Schema for paginated tech card items list."""
-    items: list[TechCardItemOut]
+    items: list[TechCardItemListRow]
     total: int
     page: int
     page_size: int
@@ -159,6 +165,7 @@ class StartingInventoryCreate(StartingInventoryBase):
 
 class StartingInventoryOut(StartingInventoryBase):
     """Schema for starting inventory output."""
+    quantity: Decimal  # Server-authored, input constraints not re-checked
     id: int
     business_id: int
     created_by: int
@@ -1,12 +1,14 @@
 """Technology Card service for recipe management and cost calculations."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
+from functools import lru_cache
 from typing import Optional, cast
 
-from sqlalchemy import select, func, and_, desc, delete
+from sqlalchemy import Select, bindparam, inspect, select, func, and_, desc, delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, load_only, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.tech_cards.models import (
     TechCardItem,
@@ -22,6 +24,51 @@ from app.tech_cards.schemas import (
 )
 from app.expenses.models import ExpenseCategory, Unit, Invoice
 from app.expenses.unit_service import UnitService
+from app.core.cache import TTLCache, MISSING
+
+
+# Item costs shared across requests, keyed by (business_id, item_id, updated_at,
+# cost data version). Editing an item bumps updated_at; any cost history or unit
+# change moves the version, so entries never outlive the data in any worker.
+item_cost_cache = TTLCache(max_size=1024, ttl_seconds=30)
+
+# Ingredient costs keyed by (business_id, category_id, ..., cost data version),
+# stale entries are never hit again and expire.
+average_cost_cache = TTLCache(max_size=1024, ttl_seconds=60)
+cost_summary_cache = TTLCache(max_size=1024, ttl_seconds=60)
+
+
+@lru_cache(maxsize=None)
+def _cost_data_version_stmt() -> Select[tuple]:
+    """
+    Fingerprint of a business's cost history and units, executed with a
+    business_id param. Inserts move max id (ids are never reused), deletes move
+    the count, unit edits move max updated_at. Both aggregates are answered from
+    the (business_id, id) and (business_id, updated_at) indexes.
+    """
+    history = (
+        select(func.count().label("count"), func.max(IngredientCostHistory.id).label("max_id"))
+        .where(IngredientCostHistory.business_id == bindparam("business_id"))
+        .subquery()
+    )
+    units = (
+        select(func.count().label("count"), func.max(Unit.updated_at).label("max_updated_at"))
+        .where(Unit.business_id == bindparam("business_id"))
+        .subquery()
+    )
+    return select(history.c.count, history.c.max_id, units.c.count, units.c.max_updated_at)
+
+
+async def get_cost_data_version(session: AsyncSession, business_id: int) -> tuple:
+    """
+    Version of the data ingredient costs are computed from, read in the caller's
+    transaction, as (cost history version, units version). Cost caches are keyed
+    on it instead of being cleared on writes, which would miss other worker
+    processes and race with uncommitted changes.
+    """
+    result = await session.execute(_cost_data_version_stmt(), {"business_id": business_id})
+    row = tuple(result.one())
+    return row[:2], row[2:]
 
 
 class TechCardService:
@@ -45,23 +92,22 @@ class TechCardService:
             approval_status=ApprovalStatus.DRAFT.value,
             created_by=user_id,
         )
-        session.add(tech_item)
-        await session.flush()
 
-        # Create ingredients
-        for idx, ingredient_data in enumerate(item_data.ingredients):
-            ingredient = TechCardItemIngredient(
-                item_id=tech_item.id,
+        # Create ingredients through the relationship, so the in-memory
+        # collection is complete after commit and needs no reload
+        tech_item.ingredients = [
+            TechCardItemIngredient(
                 ingredient_category_id=ingredient_data.ingredient_category_id,
                 quantity=ingredient_data.quantity,
                 unit_id=ingredient_data.unit_id,
                 notes=ingredient_data.notes,
                 sort_order=ingredient_data.sort_order if ingredient_data.sort_order else idx,
             )
-            session.add(ingredient)
+            for idx, ingredient_data in enumerate(item_data.ingredients)
+        ]
+        session.add(tech_item)
 
         await session.commit()
-        await session.refresh(tech_item, ["ingredients"])
         return tech_item
 
     @staticmethod
@@ -71,18 +117,19 @@ class TechCardService:
         business_id: int,
     ) -> Optional[TechCardItem]:
         """Get tech card item by ID."""
-        stmt = (
-            select(TechCardItem)
-            .options(selectinload(TechCardItem.ingredients))
-            .where(
-                and_(
-                    TechCardItem.id == item_id,
-                    TechCardItem.business_id == business_id,
-                )
-            )
+        # Identity map lookup first, the item is often already loaded in this session
+        item = await session.get(
+            TechCardItem,
+            item_id,
+            options=[selectinload(TechCardItem.ingredients), raiseload("*")],
         )
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        if not item or item.business_id != business_id:
+            return None
+
+        # Item found in identity map may have been loaded without its ingredients
+        if "ingredients" in inspect(item).unloaded:
+            await session.refresh(item, ["ingredients"])
+        return item
 
     @staticmethod
     async def list_tech_card_items(
@@ -102,23 +149,27 @@ class TechCardService:
         if approval_status is not None:
             conditions.append(TechCardItem.approval_status == approval_status)
 
-        # Count total
-        count_stmt = select(func.count()).select_from(TechCardItem).where(and_(*conditions))
-        total = await session.scalar(count_stmt)
-
-        # Get paginated items
+        # Get paginated items with total count in the same round trip
         stmt = (
-            select(TechCardItem)
-            .options(selectinload(TechCardItem.ingredients))
+            select(TechCardItem, func.count().over().label("total"))
+            .options(selectinload(TechCardItem.ingredients), raiseload("*"))
             .where(and_(*conditions))
             .order_by(desc(TechCardItem.created_at))
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
         result = await session.execute(stmt)
-        items = list(result.scalars().all())
+        rows = result.all()
 
-        return items, total or 0
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+        if page == 1:
+            return [], 0
+
+        # Page past the end returns no rows to carry the total, count separately
+        count_stmt = select(func.count()).select_from(TechCardItem).where(and_(*conditions))
+        total = await session.scalar(count_stmt)
+        return [], total or 0
 
     @staticmethod
     async def update_tech_card_item(
@@ -139,13 +190,17 @@ class TechCardService:
 
         # Update ingredients if provided
         if update_data.ingredients is not None:
-            # Delete existing ingredients
-            for ingredient in item.ingredients:
-                await session.delete(ingredient)
+            # Row may be otherwise unchanged; bump updated_at so cached cost is dropped
+            item.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-            # Create new ingredients
-            for idx, ingredient_data in enumerate(update_data.ingredients):
-                ingredient = TechCardItemIngredient(
+            # Delete existing ingredients with a single statement
+            await session.execute(
+                delete(TechCardItemIngredient).where(TechCardItemIngredient.item_id == item.id)
+            )
+
+            # Create new ingredients, replacing the loaded collection in memory
+            new_ingredients = [
+                TechCardItemIngredient(
                     item_id=item.id,
                     ingredient_category_id=ingredient_data.ingredient_category_id,
                     quantity=ingredient_data.quantity,
@@ -153,7 +208,10 @@ class TechCardService:
                     notes=ingredient_data.notes,
                     sort_order=ingredient_data.sort_order if ingredient_data.sort_order else idx,
                 )
-                session.add(ingredient)
+                for idx, ingredient_data in enumerate(update_data.ingredients)
+            ]
+            session.add_all(new_ingredients)
+            set_committed_value(item, "ingredients", new_ingredients)
 
         # Reset approval status to draft when editing (for both approved and rejected items)
         if item.approval_status in (ApprovalStatus.APPROVED.value, ApprovalStatus.REJECTED.value):
@@ -161,8 +219,8 @@ class TechCardService:
             item.approved_by = None
             item.approved_at = None
 
+        # Session keeps attributes after commit (expire_on_commit=False), no reload needed
         await session.commit()
-        await session.refresh(item)
         return item
 
     @staticmethod
@@ -195,10 +253,12 @@ class TechCardService:
 
         item.approval_status = approval_data.approval_status
         item.approved_by = user_id
-        item.approved_at = datetime.utcnow()
+        # Naive UTC like the column defaults (DateTime without time zone)
+        item.approved_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
+        # Sessions keep loaded state after commit (expire_on_commit=False) and
+        # updated_at is set client-side, so no refresh round trips are needed
         await session.commit()
-        await session.refresh(item)
         return item
 
     @staticmethod
@@ -206,32 +266,115 @@ class TechCardService:
         session: AsyncSession,
         item_id: int,
         business_id: int,
+        item: Optional[TechCardItem] = None,
     ) -> Optional[Decimal]:
         """
         Calculate total cost of tech card item based on ingredient costs.
         Uses weighted average from recent invoices.
+        Pass an already loaded item (with ingredients) to skip re-fetching it.
+        Cost history of all ingredients is fetched with a single query; results
+        are cached for a short time and shared across requests.
         """
-        item = await TechCardService.get_tech_card_item(session, item_id, business_id)
+        if item is None:
+            item = await TechCardService.get_tech_card_item(session, item_id, business_id)
         if not item:
             return None
 
-        total_cost = Decimal("0")
+        costs = await TechCardService.calculate_items_costs(
+            session=session,
+            items=[item],
+            business_id=business_id,
+        )
+        return costs[item.id]
 
-        for ingredient in item.ingredients:
-            ingredient_cost = await IngredientCostService.get_ingredient_average_cost(
-                session=session,
-                business_id=business_id,
-                category_id=ingredient.ingredient_category_id,
-                target_unit_id=ingredient.unit_id,
-            )
+    @staticmethod
+    async def calculate_items_costs(
+        session: AsyncSession,
+        items: list[TechCardItem],
+        business_id: int,
+    ) -> dict[int, Optional[Decimal]]:
+        """
+        Calculate total costs of several loaded items (with ingredients).
+        Cost history for all their ingredients is fetched with a single query.
+        Returns mapping of item ID to cost (None if it cannot be calculated).
+        """
+        costs: dict[int, Optional[Decimal]] = {}
+        pending_items: list[TechCardItem] = []
+        if not items:
+            return costs
+
+        data_version = await get_cost_data_version(session, business_id)
+
+        for item in items:
+            cached_cost = item_cost_cache.get((business_id, item.id, item.updated_at, data_version))
+            if cached_cost is MISSING:
+                pending_items.append(item)
+            else:
+                costs[item.id] = cached_cost
+
+        if not pending_items:
+            return costs
+
+        category_ids = {
+            ingredient.ingredient_category_id
+            for item in pending_items
+            for ingredient in item.ingredients
+        }
+        records_by_category = await IngredientCostService.get_recent_cost_records(
+            session=session,
+            business_id=business_id,
+            category_ids=category_ids,
+        )
 
-            if ingredient_cost is None:
-                # Cannot calculate if ingredient has no cost history
-                return None
+        # Cost cannot be calculated if an ingredient has no cost history,
+        # such items are resolved without converting any of their records
+        priced_items: list[TechCardItem] = []
+        for item in pending_items:
+            if all(
+                ingredient.ingredient_category_id in records_by_category
+                for ingredient in item.ingredients
+            ):
+                priced_items.append(item)
+            else:
+                item_cost_cache.set((business_id, item.id, item.updated_at, data_version), None)
+                costs[item.id] = None
+
+        # Units are only needed for conversions not cached yet, then all are loaded at once
+        units: Optional[dict[int, Unit]] = None
+        if not all(
+            UnitService.is_conversion_cached(record.unit_id, ingredient.unit_id, data_version[1])
+            for item in priced_items
+            for ingredient in item.ingredients
+            for record in records_by_category[ingredient.ingredient_category_id]
+        ):
+            units = await UnitService.get_units_map(session, business_id)
+
+        # Items often share ingredients, so average each (category, unit) pair once
+        average_costs: dict[tuple[int, int], Optional[Decimal]] = {}
+
+        for item in priced_items:
+            total_cost: Optional[Decimal] = Decimal("0")
+            for ingredient in item.ingredients:
+                cost_key = (ingredient.ingredient_category_id, ingredient.unit_id)
+                if cost_key not in average_costs:
+                    average_costs[cost_key] = await IngredientCostService.average_cost_from_records(
+                        session=session,
+                        records=records_by_category[ingredient.ingredient_category_id],
+                        target_unit_id=ingredient.unit_id,
+                        units=units,
+                        units_version=data_version[1],
+                    )
+                ingredient_cost = average_costs[cost_key]
+                if ingredient_cost is None:
+                    # Cannot calculate if no cost record converts to the recipe unit
+                    total_cost = None
+                    break
+                total_cost += ingredient_cost * ingredient.quantity
 
-            total_cost += ingredient_cost * ingredient.quantity
+            item_cost_cache.set((business_id, item.id, item.updated_at, data_version), total_cost)
+            costs[item.id] = total_cost
 
-        return total_cost
+        return costs
 
 
 class IngredientCostService:
@@ -251,8 +394,9 @@ class IngredientCostService:
         """
         # First, delete existing cost history records for this invoice
         # This ensures we don't have duplicates when invoice is updated
-        delete_stmt = delete(IngredientCostHistory).where(
-            IngredientCostHistory.invoice_id == invoice_id
+        delete_stmt = (
+            delete(IngredientCostHistory)
+            .where(IngredientCostHistory.invoice_id == invoice_id)
         )
         await session.execute(delete_stmt)
         
@@ -273,28 +417,34 @@ class IngredientCostService:
         if not invoice:
             return 0
 
-        count = 0
-        for item in invoice.invoice_items:
-            # Calculate cost per unit
-            cost_per_unit = item.unit_price
-
-            # Create cost history record
-            cost_record = IngredientCostHistory(
-                category_id=item.category_id,
-                business_id=business_id,
-                invoice_id=invoice_id,
-                invoice_item_id=item.id,
-                cost_per_unit=cost_per_unit,
-                unit_id=item.unit_id,
-                purchase_date=invoice.invoice_date,
-                quantity_purchased=item.quantity,
-                total_cost=item.total_price,
-            )
-            session.add(cost_record)
-            count += 1
+        # Create cost history records with a single bulk INSERT
+        cost_rows = IngredientCostService.build_cost_rows(invoice)
+        if cost_rows:
+            await session.execute(insert(IngredientCostHistory), cost_rows)
 
         await session.commit()
-        return count
+        return len(cost_rows)
+
+    @staticmethod
+    def build_cost_rows(invoice: Invoice) -> list[dict]:
+        """
+        Build cost history rows (column -> value) for invoice items.
+        Invoice must have invoice_items loaded.
+        """
+        return [
+            {
+                "category_id": item.category_id,
+                "business_id": invoice.business_id,
+                "invoice_id": invoice.id,
+                "invoice_item_id": item.id,
+                "cost_per_unit": item.unit_price,
+                "unit_id": item.unit_id,
+                "purchase_date": invoice.invoice_date,
+                "quantity_purchased": item.quantity,
+                "total_cost": item.total_price,
+            }
+            for item in invoice.invoice_items
+        ]
 
     @staticmethod
     async def get_ingredient_average_cost(
@@ -303,6 +453,7 @@ class IngredientCostService:
         category_id: int,
         target_unit_id: int,
         num_invoices: int = 3,
+        data_version: Optional[tuple] = None,
     ) -> Optional[Decimal]:
         """
         Calculate weighted average cost for ingredient.
@@ -315,78 +466,160 @@ class IngredientCostService:
             category_id: Ingredient category ID
             target_unit_id: Unit to return cost in
             num_invoices: Number of recent invoices to use (default 3)
+            data_version: Cost data version if already read in this transaction
             
         Returns:
             Average cost per target unit, or None if no data
         """
-        # Fetch more records than needed to account for conversion failures
-        # We'll keep fetching until we have enough successful conversions or run out of records
-        max_fetch_attempts = 3  # How many times to try fetching more records
-        records_per_fetch = num_invoices * 2  # Fetch 2x more to account for failures
-        offset = 0
-        successful_records: list[tuple[IngredientCostHistory, Decimal]] = []
-        
-        for attempt in range(max_fetch_attempts):
-            # Get recent cost records
-            stmt = (
-                select(IngredientCostHistory)
-                .where(
-                    and_(
-                        IngredientCostHistory.category_id == category_id,
-                        IngredientCostHistory.business_id == business_id,
-                    )
+        if data_version is None:
+            data_version = await get_cost_data_version(session, business_id)
+        cache_key = (business_id, category_id, target_unit_id, num_invoices, data_version)
+        cached_cost = average_cost_cache.get(cache_key)
+        if cached_cost is not MISSING:
+            return cached_cost
+
+        average_cost = await IngredientCostService._calculate_ingredient_average_cost(
+            session=session,
+            business_id=business_id,
+            category_id=category_id,
+            target_unit_id=target_unit_id,
+            num_invoices=num_invoices,
+            units_version=data_version[1],
+        )
+        average_cost_cache.set(cache_key, average_cost)
+        return average_cost
+
+    @staticmethod
+    async def _calculate_ingredient_average_cost(
+        session: AsyncSession,
+        business_id: int,
+        category_id: int,
+        target_unit_id: int,
+        num_invoices: int,
+        units_version: tuple,
+    ) -> Optional[Decimal]:
+        """Calculate weighted average cost for ingredient (uncached)."""
+        # Same records and averaging as item costs, for a single category
+        records_by_category = await IngredientCostService.get_recent_cost_records(
+            session=session,
+            business_id=business_id,
+            category_ids={category_id},
+            num_invoices=num_invoices,
+        )
+        return await IngredientCostService.average_cost_from_records(
+            session=session,
+            records=records_by_category.get(category_id, []),
+            target_unit_id=target_unit_id,
+            num_invoices=num_invoices,
+            units_version=units_version,
+        )
+
+    @staticmethod
+    async def get_recent_cost_records(
+        session: AsyncSession,
+        business_id: int,
+        category_ids: set[int],
+        num_invoices: int = 3,
+    ) -> dict[int, list[IngredientCostHistory]]:
+        """
+        Fetch recent cost records for several ingredient categories in one query.
+        Per category, returns the newest records (newest first), over-fetched
+        since records in units of another type fail conversion and are skipped.
+        """
+        if not category_ids:
+            return {}
+
+        # Targets differ per ingredient, so unit types can't be filtered in SQL here
+        max_records = num_invoices * 2 * 3
+        ranked = (
+            select(
+                IngredientCostHistory,
+                func.row_number()
+                .over(
+                    partition_by=IngredientCostHistory.category_id,
+                    order_by=desc(IngredientCostHistory.purchase_date),
+                )
+                .label("rank"),
+            )
+            .where(
+                and_(
+                    IngredientCostHistory.category_id.in_(category_ids),
+                    IngredientCostHistory.business_id == business_id,
                 )
-                .order_by(desc(IngredientCostHistory.purchase_date))
-                .limit(records_per_fetch)
-                .offset(offset)
             )
-            result = await session.execute(stmt)
-            cost_records = list(result.scalars().all())
+            .subquery()
+        )
+        record = aliased(IngredientCostHistory, ranked)
+        stmt = (
+            select(record)
+            .options(
+                # Only what grouping and average_cost_from_records read
+                load_only(
+                    record.category_id,
+                    record.quantity_purchased,
+                    record.unit_id,
+                    record.total_cost,
+                )
+            )
+            .where(ranked.c.rank <= max_records)
+            .order_by(ranked.c.rank)
+        )
+        result = await session.execute(stmt)
 
-            if not cost_records:
-                # No more records available
-                break
+        records_by_category: dict[int, list[IngredientCostHistory]] = {}
+        for cost_record in result.scalars().all():
+            records_by_category.setdefault(cost_record.category_id, []).append(cost_record)
+        return records_by_category
 
-            # Try to convert each record
-            for record in cost_records:
-                if len(successful_records) >= num_invoices:
-                    # We have enough successful records
-                    break
-                    
-                # Convert quantity to target unit
-                converted_qty, error = await UnitService.convert_quantity(
-                    session=session,
-                    quantity=record.quantity_purchased,
-                    from_unit_id=record.unit_id,
-                    to_unit_id=target_unit_id,
-                )
+    @staticmethod
+    async def average_cost_from_records(
+        session: AsyncSession,
+        records: list[IngredientCostHistory],
+        target_unit_id: int,
+        num_invoices: int = 3,
+        units: Optional[dict[int, Unit]] = None,
+        units_version: Optional[tuple] = None,
+    ) -> Optional[Decimal]:
+        """
+        Calculate weighted average cost from already fetched records (newest first).
+        Uses the first num_invoices records that convert to the target unit.
+        Units of uncached conversions come from `units` when given; conversion
+        factors are cached under `units_version` (see get_cost_data_version).
+        """
+        successful_records: list[tuple[IngredientCostHistory, Decimal]] = []
 
-                if converted_qty is not None and not error:
-                    # Conversion successful - add to successful records
-                    successful_records.append((record, converted_qty))
-            
-            # Check if we have enough successful records
+        for record in records:
             if len(successful_records) >= num_invoices:
                 break
-                
-            # If we fetched fewer records than requested, no point trying again
-            if len(cost_records) < records_per_fetch:
-                break
-                
-            # Prepare for next fetch
-            offset += records_per_fetch
 
+            converted_qty, error = await UnitService.convert_quantity(
+                session=session,
+                quantity=record.quantity_purchased,
+                from_unit_id=record.unit_id,
+                to_unit_id=target_unit_id,
+                units=units,
+                units_version=units_version,
+            )
+            if converted_qty is not None and not error:
+                successful_records.append((record, converted_qty))
+
+        return IngredientCostService._weighted_average_cost(successful_records)
+
+    @staticmethod
+    def _weighted_average_cost(
+        successful_records: list[tuple[IngredientCostHistory, Decimal]],
+    ) -> Optional[Decimal]:
+        """Weighted average cost per target unit from (record, converted quantity) pairs."""
         # If no successful conversions, return None
         if not successful_records:
             return None
 
         # Calculate weighted average from successful records
-        total_quantity_in_target_unit = Decimal("0")
-        total_cost = Decimal("0")
-
-        for record, converted_qty in successful_records:
-            total_quantity_in_target_unit += converted_qty
-            total_cost += record.total_cost
+        # Sums stay in Decimal, costs are money and float rounding would leak into prices
+        total_quantity_in_target_unit = sum(
+            (converted_qty for _, converted_qty in successful_records), Decimal("0")
+        )
+        total_cost = sum((record.total_cost for record, _ in successful_records), Decimal("0"))
 
         if total_quantity_in_target_unit == 0:
             return None
@@ -401,6 +634,29 @@ class IngredientCostService:
         category_id: int,
     ) -> Optional[IngredientCostSummary]:
         """Get cost summary for an ingredient."""
+        data_version = await get_cost_data_version(session, business_id)
+        cache_key = (business_id, category_id, data_version)
+        cached_summary = cost_summary_cache.get(cache_key)
+        if cached_summary is not MISSING:
+            return cached_summary
+
+        summary = await IngredientCostService._calculate_ingredient_cost_summary(
+            session=session,
+            business_id=business_id,
+            category_id=category_id,
+            data_version=data_version,
+        )
+        cost_summary_cache.set(cache_key, summary)
+        return summary
+
+    @staticmethod
+    async def _calculate_ingredient_cost_summary(
+        session: AsyncSession,
+        business_id: int,
+        category_id: int,
+        data_version: tuple,
+    ) -> Optional[IngredientCostSummary]:
+        """Build cost summary for an ingredient (uncached)."""
         # Get category info
         category = await session.get(ExpenseCategory, category_id)
         if not category:
@@ -409,8 +665,14 @@ class IngredientCostService:
         # Get base unit for this category's unit type
         # This is a simplified approach - in reality you'd need to determine
         # the appropriate base unit based on the category's typical unit type
-        stmt = (
-            select(IngredientCostHistory)
+        # Only the date range, count and newest unit of the 3 most recent records are needed
+        recent = (
+            select(
+                IngredientCostHistory.purchase_date,
+                func.first_value(IngredientCostHistory.unit_id)
+                .over(order_by=desc(IngredientCostHistory.purchase_date))
+                .label("latest_unit_id"),
+            )
             .where(
                 and_(
                     IngredientCostHistory.category_id == category_id,
@@ -419,16 +681,24 @@ class IngredientCostService:
             )
             .order_by(desc(IngredientCostHistory.purchase_date))
             .limit(3)
+            .subquery()
         )
-        result = await session.execute(stmt)
-        records = list(result.scalars().all())
+        result = await session.execute(
+            select(
+                func.count(),
+                func.min(recent.c.purchase_date),
+                func.max(recent.c.purchase_date),
+                func.max(recent.c.latest_unit_id),
+            ).select_from(recent)
+        )
+        records_count, date_range_from, date_range_to, latest_unit_id = result.one()
 
-        if not records:
+        if not records_count:
             return None
 
         # For now, use the most recent record's unit as base
         # In production, determine proper base unit
-        base_unit_id = records[0].unit_id
+        base_unit_id = latest_unit_id
         base_unit = await session.get(Unit, base_unit_id)
         
         if not base_unit:
@@ -439,6 +709,7 @@ class IngredientCostService:
             business_id=business_id,
             category_id=category_id,
             target_unit_id=base_unit_id,
+            data_version=data_version,
         )
 
         if avg_cost is None:
@@ -450,7 +721,7 @@ class IngredientCostService:
             average_cost_per_base_unit=avg_cost,
             base_unit_name=cast(str, base_unit.name),
             base_unit_symbol=cast(str, base_unit.symbol),
-            invoices_analyzed=len(records),
-            date_range_from=min(r.purchase_date for r in records),
-            date_range_to=max(r.purchase_date for r in records),
+            invoices_analyzed=records_count,
+            date_range_from=date_range_from,
+            date_range_to=date_range_to,
         )
@@ -18,7 +18,9 @@ from collections import defaultdict
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.core.db import async_session_maker
 # Import core models first to ensure relationships resolve correctly
@@ -27,68 +29,87 @@ from app.expenses.models import Invoice, InvoiceStatus
 from app.tech_cards.service import IngredientCostService
 from app.tech_cards.models import IngredientCostHistory
 
+# Invoices fetched per round trip while streaming
+STREAM_BATCH_SIZE = 500
+# Cost history rows inserted (and committed) per batch
+INSERT_BATCH_SIZE = 1000
+
 
 async def migrate_invoice_costs():
     """Migrate all paid invoices to ingredient_cost_history."""
     
     print("🔄 Starting migration of invoice costs to ingredient_cost_history...")
     
-    async with async_session_maker() as session:
+    # Invoices are streamed on one session while batches are committed on another,
+    # committing would otherwise end the transaction holding the server-side cursor
+    async with async_session_maker() as read_session, async_session_maker() as write_session:
         try:
-            # Get all paid invoices
-            stmt = select(Invoice).where(Invoice.paid_status == InvoiceStatus.PAID)
-            result = await session.execute(stmt)
-            invoices = list(result.scalars().all())
-            
-            if not invoices:
-                print("✅ No paid invoices found. Nothing to migrate.")
-                return
+            paid_filter = Invoice.paid_status == InvoiceStatus.PAID
+            migrated_filter = Invoice.id.in_(
+                select(IngredientCostHistory.invoice_id).distinct()
+            )
+
+            # Invoices that already have cost history are skipped in SQL
+            skipped_result = await read_session.execute(
+                select(func.count()).select_from(Invoice).where(paid_filter, migrated_filter)
+            )
+            skipped_count = skipped_result.scalar() or 0
+            if skipped_count:
+                print(f"⏭️  {skipped_count} paid invoices already have cost records, skipping")
             
-            print(f"📊 Found {len(invoices)} paid invoices to process...")
+            # Stream paid invoices that still need migration
+            stmt = (
+                select(Invoice)
+                .options(selectinload(Invoice.invoice_items))
+                .where(paid_filter, ~migrated_filter)
+                .order_by(Invoice.id)
+                .execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            invoices = await read_session.stream_scalars(stmt)
             
             migrated_count = 0
-            skipped_count = 0
             error_count = 0
+            # (invoice label, cost rows) per invoice, so a failing batch can be retried per invoice
+            pending: list[tuple[str, list[dict]]] = []
+            pending_rows = 0
             
-            for invoice in invoices:
+            async for invoice in invoices:
+                label = f"#{invoice.invoice_number} (ID: {invoice.id}, Business: {invoice.business_id})"
                 try:
-                    # Check if this invoice already has cost history
-                    existing_stmt = select(func.count()).select_from(IngredientCostHistory).where(
-                        IngredientCostHistory.invoice_id == invoice.id
-                    )
-                    existing_result = await session.execute(existing_stmt)
-                    existing_count = existing_result.scalar() or 0
-                    
-                    if existing_count > 0:
-                        print(f"⏭️  Invoice #{invoice.invoice_number} (ID: {invoice.id}, Business: {invoice.business_id}) - already has {existing_count} cost records, skipping")
-                        skipped_count += 1
-                        continue
-                    
-                    # Sync costs for this invoice
-                    count = await IngredientCostService.sync_invoice_costs(
-                        session=session,
-                        invoice_id=cast(int, invoice.id),
-                        business_id=cast(int, invoice.business_id),
-                    )
-                    
-                    if count > 0:
-                        print(f"✅ Invoice #{invoice.invoice_number} (ID: {invoice.id}, Business: {invoice.business_id}) - migrated {count} items")
-                        migrated_count += 1
-                    else:
-                        print(f"⚠️  Invoice #{invoice.invoice_number} (ID: {invoice.id}, Business: {invoice.business_id}) - no items to migrate")
-                        skipped_count += 1
-                        
+                    cost_rows = IngredientCostService.build_cost_rows(invoice)
                 except Exception as e:
-                    print(f"❌ Error processing invoice #{invoice.invoice_number} (ID: {invoice.id}, Business: {invoice.business_id}): {e}")
+                    print(f"❌ Error processing invoice {label}: {e}")
                     error_count += 1
                     continue
+                
+                if cost_rows:
+                    print(f"✅ Invoice {label} - migrating {len(cost_rows)} items")
+                    pending.append((label, cost_rows))
+                    pending_rows += len(cost_rows)
+                    migrated_count += 1
+                else:
+                    print(f"⚠️  Invoice {label} - no items to migrate")
+                    skipped_count += 1
+                
+                if pending_rows >= INSERT_BATCH_SIZE:
+                    failed = await _insert_cost_rows(write_session, pending)
+                    migrated_count -= failed
+                    error_count += failed
+                    pending_rows = 0
             
-            await session.commit()
+            if pending:
+                failed = await _insert_cost_rows(write_session, pending)
+                migrated_count -= failed
+                error_count += failed
+            
+            if not migrated_count and not skipped_count and not error_count:
+                print("✅ No paid invoices found. Nothing to migrate.")
+                return
             
             print("\n" + "="*60)
             print("📈 Migration Summary:")
             print(f"   ✅ Successfully migrated: {migrated_count} invoices")
-            print(f"   ⏭️  Skipped (already exists): {skipped_count} invoices")
+            print(f"   ⏭️  Skipped (already exists or empty): {skipped_count} invoices")
             print(f"   ❌ Errors: {error_count} invoices")
             print("="*60)
             
@@ -99,10 +120,40 @@ async def migrate_invoice_costs():
                 
         except Exception as e:
             print(f"\n❌ Fatal error during migration: {e}")
-            await session.rollback()
+            await write_session.rollback()
             raise
 
 
+async def _insert_cost_rows(session: AsyncSession, pending: list[tuple[str, list[dict]]]) -> int:
+    """
+    Insert and commit a batch of invoices' cost history rows, then clear the batch.
+    If the batch fails, its invoices are retried one by one, so a bad invoice only
+    fails itself. Returns the number of invoices that failed.
+    """
+    try:
+        rows = [row for _, cost_rows in pending for row in cost_rows]
+        await session.execute(insert(IngredientCostHistory), rows)
+        await session.commit()
+        print(f"💾 Committed batch of {len(rows)} cost records")
+        pending.clear()
+        return 0
+    except Exception:
+        await session.rollback()
+    
+    failed_count = 0
+    for label, cost_rows in pending:
+        try:
+            await session.execute(insert(IngredientCostHistory), cost_rows)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Error processing invoice {label}: {e}")
+            failed_count += 1
+    print(f"💾 Committed batch of {len(pending) - failed_count} invoices one by one")
+    pending.clear()
+    return failed_count
+
+
 async def check_migration_status():
     """Check how many invoices need migration."""
     
@@ -128,18 +179,17 @@ async def check_migration_status():
             for business_id, count in business_counts.items():
                 print(f"   Business ID {business_id}: {count} paid invoices")
             
-            # Check which invoices already have cost history
+            # Check which invoices already have cost history (one query for all invoices)
+            existing_result = await session.execute(
+                select(IngredientCostHistory.invoice_id).distinct()
+            )
+            existing_ids = set(existing_result.scalars().all())
+            
             invoices_to_migrate = []
             invoices_already_migrated = []
             
             for invoice in paid_invoices:
-                existing_stmt = select(func.count()).select_from(IngredientCostHistory).where(
-                    IngredientCostHistory.invoice_id == invoice.id
-                )
-                existing_result = await session.execute(existing_stmt)
-                existing_count = existing_result.scalar() or 0
-                
-                if existing_count > 0:
+                if invoice.id in existing_ids:
                     invoices_already_migrated.append(invoice)
                 else:
                     invoices_to_migrate.append(invoice)
@@ -2,28 +2,38 @@
 pytest configuration and shared fixtures.
 """
 import os
-import asyncio
-from typing import AsyncGenerator, Generator
+from functools import lru_cache
+from typing import AsyncGenerator, Awaitable, Callable
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from passlib.context import CryptContext  # type: ignore
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.core.db import Base, get_db
 from app.core_models import User, Role, Permission, UserRole
-from app.core.security import hash_password
+from app.core import security
+from app.core.permissions import invalidate_permission_cache
+from app.core.security import hash_password, create_access_token
 
-# Test database URL
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# Test database URL (in-memory, StaticPool shares the single connection).
+# Each pytest-xdist worker process gets its own database.
+TEST_DATABASE_URL = (
+    f"sqlite+aiosqlite:///file:testdb_{os.getenv('PYTEST_XDIST_WORKER', 'main')}"
+    "?mode=memory&cache=shared&uri=true"
+)
 
-# Create test engine
+# Create test engine. The single StaticPool connection never goes stale, so no
+# pre-ping; statement logging is opt-in only (TEST_DB_ECHO=true).
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
-    echo=True if os.getenv("TEST_DB_ECHO") == "true" else False
+    pool_pre_ping=False,
+    echo=os.getenv("TEST_DB_ECHO") == "true",
 )
 
 # Test session factory
@@ -32,174 +42,302 @@ TestingSessionLocal = async_sessionmaker(
 )
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_configure(config: pytest.Config) -> None:
+    """Use the cheapest bcrypt cost in tests, hashing strength is irrelevant here."""
+    security.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a fresh database session for each test."""
+@lru_cache(maxsize=None)
+def _hashed_password(password: str) -> str:
+    """Hash of a fixture password, computed once per test session."""
+    return hash_password(password)
+
+
+@event.listens_for(test_engine.sync_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with (aio)sqlite."""
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def _emit_begin(conn):
+    """Start transactions explicitly (pysqlite's implicit BEGIN is disabled)."""
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def setup_database() -> AsyncGenerator[dict[type[Base], dict[str, int]], None]:
+    """
+    Create the schema and default roles and permissions once per test session.
+    Yields IDs of the seeded rows by model and name.
+    """
     async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
-    
-    async with TestingSessionLocal() as session:
-        # Create default roles and permissions
-        from app.core_models import Role, Permission, UserRole
-        
-        # Create roles
-        roles_to_create = [
-            Role(name=UserRole.ADMIN.value, description="System administrator"),
-            Role(name=UserRole.BUSINESS_OWNER.value, description="Business owner"),
-            Role(name=UserRole.EMPLOYEE.value, description="Employee"),
-        ]
-        
-        for role in roles_to_create:
-            session.add(role)
-        
-        # Create sample permissions
-        permissions_to_create = [
-            Permission(name="VIEW_DATA", description="View data", resource="data", action="view"),
-            Permission(name="EDIT_DATA", description="Edit data", resource="data", action="edit"),
-            Permission(name="MANAGE_USERS", description="Manage users", resource="users", action="manage"),
-        ]
-        
-        for permission in permissions_to_create:
-            session.add(permission)
-        
-        await session.commit()
-        yield session
-    
+
+        # Static reference data, one Core executemany per table
+        await conn.execute(insert(Role), [
+            {"name": UserRole.ADMIN.value, "description": "System administrator"},
+            {"name": UserRole.BUSINESS_OWNER.value, "description": "Business owner"},
+            {"name": UserRole.EMPLOYEE.value, "description": "Employee"},
+        ])
+        await conn.execute(insert(Permission), [
+            {"name": "VIEW_DATA", "description": "View data", "resource": "data", "action": "view"},
+            {"name": "EDIT_DATA", "description": "Edit data", "resource": "data", "action": "edit"},
+            {"name": "MANAGE_USERS", "description": "Manage users", "resource": "users", "action": "manage"},
+        ])
+
+        invalidate_permission_cache()
+        seed_ids = {
+            model: {name: row_id for name, row_id in await conn.execute(select(model.name, model.id))}
+            for model in (Role, Permission)
+        }
+
+    yield seed_ids
+
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
 
-@pytest_asyncio.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with database dependency override."""
-    def override_get_db():
-        yield db_session
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
+@pytest.fixture(scope="session")
+def role_ids(setup_database: dict[type[Base], dict[str, int]]) -> dict[str, int]:
+    """Seeded role IDs by role name."""
+    return setup_database[Role]
+
+
+@pytest.fixture(scope="session")
+def permission_ids(setup_database: dict[type[Base], dict[str, int]]) -> dict[str, int]:
+    """Seeded permission IDs by permission name."""
+    return setup_database[Permission]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def db_connection(
+    setup_database: dict[type[Base], dict[str, int]],
+) -> AsyncGenerator[AsyncConnection, None]:
+    """Connection whose transaction spans a test module, rolled back at its end."""
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_db_session(db_connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for rows shared by all tests of a module.
+    Commits land in the module transaction, so every test of the module sees them.
+    """
+    session = AsyncSession(
+        bind=db_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session(db_connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create a database session for each test, isolated by a SAVEPOINT.
+    Commits inside the test only release nested SAVEPOINTs, everything is rolled
+    back on teardown, so the schema, seed data and module rows are reused.
+    """
+    test_savepoint = await db_connection.begin_nested()
+    session = AsyncSession(
+        bind=db_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+        await test_savepoint.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """HTTP client for the app, shared by the whole test session."""
     async with AsyncClient(
         transport=ASGITransport(app=app),
         base_url="http://test"
     ) as test_client:
         yield test_client
-    
-    app.dependency_overrides.clear()
 
 
 @pytest_asyncio.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user with EMPLOYEE role."""
-    from sqlalchemy import select
+async def client(db_session: AsyncSession, http_client: AsyncClient) -> AsyncGenerator[AsyncClient, None]:
+    """Test client with database dependency override."""
+    def override_get_db():
+        yield db_session
     
-    # Get existing EMPLOYEE role
-    employee_role = await db_session.scalar(select(Role).where(Role.name == UserRole.EMPLOYEE.value))
-    assert employee_role is not None, "EMPLOYEE role not found"
+    app.dependency_overrides[get_db] = override_get_db
+    http_client.cookies.clear()
     
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=hash_password("testpassword"),
-        role_id=employee_role.id
-    )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+    yield http_client
+    
+    app.dependency_overrides.pop(get_db, None)
 
 
 @pytest_asyncio.fixture
-async def test_business_owner(db_session: AsyncSession) -> User:
-    """Create a test business owner user."""
-    from sqlalchemy import select
-    
-    # Get existing BUSINESS_OWNER role
-    business_owner_role = await db_session.scalar(select(Role).where(Role.name == UserRole.BUSINESS_OWNER.value))
-    assert business_owner_role is not None, "BUSINESS_OWNER role not found"
-    
+async def readonly_client(http_client: AsyncClient) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Test client for requests rejected by validation before any query runs.
+    Skips the per-test SAVEPOINT; the session is unbound, so a query fails loudly.
+    """
+    async def override_get_db():
+        async with AsyncSession() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    http_client.cookies.clear()
+
+    yield http_client
+
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def _create_user(
+    session: AsyncSession,
+    role_id: int,
+    email: str,
+    username: str,
+    password: str,
+) -> User:
+    """
+    Create and commit a user with an existing role.
+    All columns are set client-side and id comes back from the INSERT, no refresh needed.
+    """
     user = User(
-        email="business@example.com",
-        username="businessowner",
-        password_hash=hash_password("businesspassword"),
-        role_id=business_owner_role.id
+        email=email,
+        username=username,
+        password_hash=_hashed_password(password),
+        role_id=role_id
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    session.add(user)
+    await session.commit()
     return user
 
 
-@pytest_asyncio.fixture
-async def test_admin(db_session: AsyncSession) -> User:
-    """Create a test admin user."""
-    from sqlalchemy import select
-    
-    # Get existing ADMIN role
-    admin_role = await db_session.scalar(select(Role).where(Role.name == UserRole.ADMIN.value))
-    assert admin_role is not None, "ADMIN role not found"
-    
-    user = User(
-        email="admin@example.com",
-        username="testadmin",
-        password_hash=hash_password("adminpassword"),
-        role_id=admin_role.id
-    )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+async def _attach_user(session: AsyncSession, user: User) -> User:
+    """
+    Attach a module user to the test's session with its role loaded,
+    role guards read user.role synchronously and can't lazy load it.
+    Fixtures request the module user before db_session, so it is committed
+    outside the test's SAVEPOINT and outlives the test.
+    """
+    user = await session.merge(user, load=False)
+    await session.refresh(user, attribute_names=["role"])
     return user
 
 
-@pytest_asyncio.fixture
-async def sample_user_with_role(db_session: AsyncSession) -> tuple[User, Role]:
-    """Create a sample user with role for testing."""
-    from sqlalchemy import select
-    
-    # Get existing EMPLOYEE role
-    role = await db_session.scalar(select(Role).where(Role.name == UserRole.EMPLOYEE.value))
-    assert role is not None, "EMPLOYEE role not found"
-    
-    user = User(
-        email="sample@example.com",
-        username="sampleuser",
-        password_hash=hash_password("samplepassword"),
-        role_id=role.id
+@pytest_asyncio.fixture(scope="module")
+async def module_test_user(module_db_session: AsyncSession, role_ids: dict[str, int]) -> User:
+    """Create the EMPLOYEE test user once per module."""
+    return await _create_user(
+        module_db_session, role_ids[UserRole.EMPLOYEE.value], "test@example.com", "testuser", "testpassword"
+    )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_test_business_owner(module_db_session: AsyncSession, role_ids: dict[str, int]) -> User:
+    """Create the BUSINESS_OWNER test user once per module."""
+    return await _create_user(
+        module_db_session, role_ids[UserRole.BUSINESS_OWNER.value], "business@example.com", "businessowner", "businesspassword"
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user, role
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_test_admin(module_db_session: AsyncSession, role_ids: dict[str, int]) -> User:
+    """Create the ADMIN test user once per module."""
+    return await _create_user(
+        module_db_session, role_ids[UserRole.ADMIN.value], "admin@example.com", "testadmin", "adminpassword"
+    )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_sample_user(module_db_session: AsyncSession, role_ids: dict[str, int]) -> User:
+    """Create the sample EMPLOYEE user once per module."""
+    return await _create_user(
+        module_db_session, role_ids[UserRole.EMPLOYEE.value], "sample@example.com", "sampleuser", "samplepassword"
+    )
+
+
+@pytest.fixture
+def make_user(
+    db_session: AsyncSession, role_ids: dict[str, int]
+) -> Callable[..., Awaitable[User]]:
+    """
+    Factory for extra users in the test's session, e.g. `await make_user(UserRole.ADMIN.value)`.
+    Email and username default to ones derived from the role name.
+    """
+    async def _make_user(
+        role_name: str,
+        *,
+        email: str | None = None,
+        username: str | None = None,
+        password: str = "password",
+    ) -> User:
+        prefix = role_name.lower()
+        user = await _create_user(
+            db_session,
+            role_ids[role_name],
+            email or f"{prefix}@example.org",
+            username or f"{prefix}_user",
+            password,
+        )
+        await db_session.refresh(user, attribute_names=["role"])
+        return user
+
+    return _make_user
 
 
 @pytest_asyncio.fixture
-async def sample_permission(db_session: AsyncSession) -> Permission:
-    """Get a sample permission for testing."""
-    from sqlalchemy import select
-    
-    permission = await db_session.scalar(select(Permission).where(Permission.name == "VIEW_DATA"))
-    assert permission is not None, "VIEW_DATA permission not found"
-    return permission
+async def test_user(module_test_user: User, db_session: AsyncSession) -> User:
+    """Test user with EMPLOYEE role, attached to the test's session."""
+    return await _attach_user(db_session, module_test_user)
 
 
 @pytest_asyncio.fixture
-async def client_with_mongodb(db_session: AsyncSession, mongodb_mock) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with both database and MongoDB dependency overrides."""
-    def override_get_db():
-        yield db_session
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test"
-    ) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+async def test_business_owner(module_test_business_owner: User, db_session: AsyncSession) -> User:
+    """Test business owner user, attached to the test's session."""
+    return await _attach_user(db_session, module_test_business_owner)
+
+
+@pytest_asyncio.fixture
+async def test_admin(module_test_admin: User, db_session: AsyncSession) -> User:
+    """Test admin user, attached to the test's session."""
+    return await _attach_user(db_session, module_test_admin)
+
+
+@pytest_asyncio.fixture
+async def sample_user_with_role(module_sample_user: User, db_session: AsyncSession) -> tuple[User, Role]:
+    """Sample user with its role for testing, attached to the test's session."""
+    user = await _attach_user(db_session, module_sample_user)
+    return user, user.role
+
+
+@pytest.fixture(scope="module")
+def auth_token(module_test_user: User) -> str:
+    """Access token of test_user, issued once per module (same as /auth/login issues)."""
+    return create_access_token(subject=module_test_user.id)
+
+
+@pytest.fixture
+def auth_headers(auth_token: str) -> dict[str, str]:
+    """Authorization headers for requests made as test_user."""
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+@pytest_asyncio.fixture
+async def sample_permission(db_session: AsyncSession, permission_ids: dict[str, int]) -> Permission:
+    """Get a sample permission for testing."""
+    permission = await db_session.get(Permission, permission_ids["VIEW_DATA"])
+    assert permission is not None, "VIEW_DATA permission not found"
+    return permission
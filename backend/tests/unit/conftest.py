@@ -0,0 +1,111 @@
+"""
+Shared fixtures for business domain tests (business, units, expense categories).
+
+Rows are created once per module through module_db_session and attached to
+each test's session, the test SAVEPOINT rolls back whatever a test changes.
+"""
+# mypy: disable-error-code="arg-type"
+# SQLAlchemy model attributes are typed as Column[T] but after session.refresh() they become T at runtime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import Base
+from app.core_models import User, Business
+from app.expenses.models import ExpenseSection, ExpenseCategory, Unit, UnitType
+
+
+@pytest.fixture(scope="module")
+async def module_business_data(
+    module_db_session: AsyncSession, module_test_business_owner: User
+) -> dict[str, Base]:
+    """
+    Create the test business with its units, expense section and category once per module.
+    Rows are linked through relationships and inserted by a single commit. Every
+    column, nullable ones included, is set client-side, so no refresh is needed.
+    """
+    owner_id = module_test_business_owner.id
+    business = Business(
+        name="Test Coffee Shop",
+        city="Test City",
+        address="123 Test St",
+        owner_id=owner_id,
+        is_active=True,
+    )
+    unit = Unit(
+        name="kilogram",
+        symbol="kg",
+        unit_type=UnitType.WEIGHT,
+        business=business,
+        description=None,
+        base_unit_id=None,
+        conversion_factor=Decimal("1"),  # Column default is a float
+        is_active=True,
+    )
+    unit_gram = Unit(
+        name="gram",
+        symbol="g",
+        unit_type=UnitType.WEIGHT,
+        business=business,
+        description=None,
+        base_unit=unit,
+        conversion_factor=Decimal("0.001"),  # 1g = 0.001kg
+        is_active=True,
+    )
+    section = ExpenseSection(
+        name="Ingredients",
+        business=business,
+        created_by=owner_id,
+        order_index=1,
+        is_active=True,
+    )
+    category = ExpenseCategory(
+        name="Coffee Beans",
+        section=section,
+        business=business,
+        default_unit=unit,
+        created_by=owner_id,
+        order_index=1,
+        is_active=True,
+    )
+    rows = {
+        "business": business,
+        "unit": unit,
+        "unit_gram": unit_gram,
+        "section": section,
+        "category": category,
+    }
+    module_db_session.add_all(rows.values())
+    await module_db_session.commit()
+    return rows
+
+
+@pytest.fixture
+async def test_business(db_session: AsyncSession, module_business_data: dict[str, Base]) -> Business:
+    """Test business, attached to the test's session."""
+    return await db_session.merge(module_business_data["business"], load=False)
+
+
+@pytest.fixture
+async def test_unit(db_session: AsyncSession, module_business_data: dict[str, Base]) -> Unit:
+    """Test unit (kg), attached to the test's session."""
+    return await db_session.merge(module_business_data["unit"], load=False)
+
+
+@pytest.fixture
+async def test_unit_gram(db_session: AsyncSession, module_business_data: dict[str, Base]) -> Unit:
+    """Test unit (gram) derived from kg, attached to the test's session."""
+    return await db_session.merge(module_business_data["unit_gram"], load=False)
+
+
+@pytest.fixture
+async def test_section(db_session: AsyncSession, module_business_data: dict[str, Base]) -> ExpenseSection:
+    """Test expense section, attached to the test's session."""
+    return await db_session.merge(module_business_data["section"], load=False)
+
+
+@pytest.fixture
+async def test_category(db_session: AsyncSession, module_business_data: dict[str, Base]) -> ExpenseCategory:
+    """Test expense category, attached to the test's session."""
+    return await db_session.merge(module_business_data["category"], load=False)
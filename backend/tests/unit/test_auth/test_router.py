@@ -1,13 +1,76 @@
 """
 Tests for authentication endpoints.
 """
+import asyncio
+
+import pytest
 from httpx import AsyncClient
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core_models import User, Role
+from app.core.rate_limiter import login_rate_limiter
 from app.core.security import create_access_token
 
+# Payloads rejected by request validation before reaching the database
+INVALID_REGISTER_PAYLOADS = {
+    "invalid email format": {
+        "email": "invalid-email",
+        "username": "validusername",
+        "password": "securepassword123",
+        "role": "EMPLOYEE",
+    },
+    "too short password": {
+        "email": "valid@example.com",
+        "username": "validusername",
+        "password": "123",
+        "role": "EMPLOYEE",
+    },
+    "missing username and password": {
+        "email": "valid@example.com",
+    },
+    "empty email": {
+        "email": "",
+        "username": "validusername",
+        "password": "securepassword123",
+        "role": "EMPLOYEE",
+    },
+    "empty username": {
+        "email": "valid@example.com",
+        "username": "",
+        "password": "securepassword123",
+        "role": "EMPLOYEE",
+    },
+    "invalid role": {
+        "email": "newuser@example.com",
+        "username": "newuser",
+        "password": "securepassword123",
+        "role": "INVALID_ROLE",
+    },
+}
+
+INVALID_LOGIN_PAYLOADS = {
+    "missing password": {
+        "email": "test@example.com",
+    },
+    "empty email": {
+        "email": "",
+        "password": "somepassword",
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_login_rate_limit():
+    """Every test client shares one address, so start each test with a fresh login window."""
+    login_rate_limiter.requests.clear()
+
+
+async def post_all(client: AsyncClient, url: str, payloads: dict[str, dict]) -> dict[str, int]:
+    """POST independent payloads concurrently, return status code per payload name."""
+    responses = await asyncio.gather(*(client.post(url, json=payload) for payload in payloads.values()))
+    return {name: response.status_code for name, response in zip(payloads, responses)}
+
 
 class TestAuthRegistration:
     """Test user registration endpoint."""
@@ -18,10 +81,10 @@ class TestAuthRegistration:
             "email": "newuser@example.com",
             "username": "newuser",
             "password": "securepassword123",
-            "role": "BUYER"
+            "role": "EMPLOYEE"
         }
         
-        response = await client.post("/auth/register", json=user_data)
+        response = await client.post("/api/auth/register", json=user_data)
         
         # Debug: print response if test fails
         if response.status_code != 201:
@@ -40,10 +103,10 @@ class TestAuthRegistration:
             "email": test_user.email,  # Already exists
             "username": "differentusername",
             "password": "securepassword123",
-            "role": "BUYER"
+            "role": "EMPLOYEE"
         }
 
-        response = await client.post("/auth/register", json=user_data)
+        response = await client.post("/api/auth/register", json=user_data)
 
         assert response.status_code == 409
         data = response.json()
@@ -56,56 +119,21 @@ class TestAuthRegistration:
             "email": "different@example.com",
             "username": test_user.username,  # Already exists
             "password": "securepassword123",
-            "role": "BUYER"
+            "role": "EMPLOYEE"
         }
 
-        response = await client.post("/auth/register", json=user_data)
+        response = await client.post("/api/auth/register", json=user_data)
 
         assert response.status_code == 409
         data = response.json()
         assert "error_code" in data
         assert data["error_code"] == "USERNAME_ALREADY_EXISTS"
 
-    async def test_register_invalid_email_format(self, client: AsyncClient):
-        """Test registration with invalid email format."""
-        user_data = {
-            "email": "invalid-email",
-            "username": "validusername",
-            "password": "securepassword123",
-            "role": "BUYER"
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        
-        assert response.status_code == 422
-        data = response.json()
-        assert "detail" in data
-
-    async def test_register_short_password(self, client: AsyncClient):
-        """Test registration with too short password."""
-        user_data = {
-            "email": "valid@example.com",
-            "username": "validusername",
-            "password": "123",  # Too short
-            "role": "BUYER"
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        
-        assert response.status_code == 422
-        data = response.json()
-        assert "detail" in data
+    async def test_register_validation_failures(self, readonly_client: AsyncClient):
+        """Test registration with invalid payloads is rejected by validation."""
+        status_codes = await post_all(readonly_client, "/api/auth/register", INVALID_REGISTER_PAYLOADS)
 
-    async def test_register_missing_fields(self, client: AsyncClient):
-        """Test registration with missing required fields."""
-        user_data = {
-            "email": "valid@example.com"
-            # Missing username and password
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        
-        assert response.status_code == 422
+        assert status_codes == {name: 422 for name in INVALID_REGISTER_PAYLOADS}
 
     async def test_register_invalid_role_in_db(self, client: AsyncClient, db_session: AsyncSession):
         """Test registration when role doesn't exist in database."""
@@ -117,10 +145,10 @@ class TestAuthRegistration:
             "email": "newuser@example.com",
             "username": "newuser",
             "password": "securepassword123",
-            "role": "BUYER"  # Valid enum but not in DB
+            "role": "EMPLOYEE"  # Valid enum but not in DB
         }
         
-        response = await client.post("/auth/register", json=user_data)
+        response = await client.post("/api/auth/register", json=user_data)
         
         assert response.status_code == 400
         data = response.json()
@@ -138,7 +166,7 @@ class TestAuthLogin:
             "password": "testpassword"  # From fixture
         }
         
-        response = await client.post("/auth/login", json=login_data)
+        response = await client.post("/api/auth/login", json=login_data)
         
         assert response.status_code == 200
         data = response.json()
@@ -153,7 +181,7 @@ class TestAuthLogin:
             "password": "somepassword"
         }
         
-        response = await client.post("/auth/login", json=login_data)
+        response = await client.post("/api/auth/login", json=login_data)
         
         assert response.status_code == 401
         data = response.json()
@@ -167,42 +195,28 @@ class TestAuthLogin:
             "password": "wrongpassword"
         }
         
-        response = await client.post("/auth/login", json=login_data)
+        response = await client.post("/api/auth/login", json=login_data)
         
         assert response.status_code == 401
         data = response.json()
         assert "error_code" in data
         assert data["error_code"] == "INVALID_CREDENTIALS"
 
-    async def test_login_missing_fields(self, client: AsyncClient):
-        """Test login with missing required fields."""
-        login_data = {
-            "email": "test@example.com"
-            # Missing password
-        }
-        
-        response = await client.post("/auth/login", json=login_data)
-        
-        assert response.status_code == 422
+    async def test_login_validation_failures(self, readonly_client: AsyncClient):
+        """Test login with invalid payloads is rejected by validation."""
+        status_codes = await post_all(readonly_client, "/api/auth/login", INVALID_LOGIN_PAYLOADS)
+
+        assert status_codes == {name: 422 for name in INVALID_LOGIN_PAYLOADS}
 
 
 class TestAuthMe:
     """Test /me endpoint for getting current user info."""
 
-    async def test_me_with_valid_token(self, client: AsyncClient, test_user: User):
+    async def test_me_with_valid_token(
+        self, client: AsyncClient, test_user: User, auth_headers: dict[str, str]
+    ):
         """Test /me endpoint with valid authentication token."""
-        # First login to get token
-        login_data = {
-            "email": test_user.email,
-            "password": "testpassword"
-        }
-        login_response = await client.post("/auth/login", json=login_data)
-        assert login_response.status_code == 200
-        token = login_response.json()["access_token"]
-        
-        # Use token to access /auth/me
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get("/auth/me", headers=headers)
+        response = await client.get("/api/auth/me", headers=auth_headers)
         
         assert response.status_code == 200
         data = response.json()
@@ -213,7 +227,7 @@ class TestAuthMe:
 
     async def test_me_without_token(self, client: AsyncClient):
         """Test /auth/me endpoint without authentication token."""
-        response = await client.get("/auth/me")
+        response = await client.get("/api/auth/me")
 
         assert response.status_code == 401
         data = response.json()
@@ -222,7 +236,7 @@ class TestAuthMe:
     async def test_me_with_invalid_token(self, client: AsyncClient):
         """Test /auth/me endpoint with invalid token."""
         headers = {"Authorization": "Bearer invalid_token_here"}
-        response = await client.get("/auth/me", headers=headers)
+        response = await client.get("/api/auth/me", headers=headers)
 
         assert response.status_code == 401
         data = response.json()
@@ -234,25 +248,10 @@ class TestAuthMe:
     async def test_me_with_malformed_header(self, client: AsyncClient):
         """Test /auth/me endpoint with malformed Authorization header."""
         headers = {"Authorization": "InvalidFormat token_here"}
-        response = await client.get("/auth/me", headers=headers)
+        response = await client.get("/api/auth/me", headers=headers)
         
         assert response.status_code == 401
     
-    async def test_register_invalid_role(self, client: AsyncClient):
-        """Test registration with invalid role."""
-        user_data = {
-            "email": "newuser@example.com",
-            "username": "newuser",
-            "password": "securepassword123",
-            "role": "INVALID_ROLE"
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        
-        assert response.status_code == 422  # Pydantic validation error for enum
-        data = response.json()
-        assert "detail" in data
-
     async def test_me_user_not_found(self, client: AsyncClient, db_session: AsyncSession):
         """Test /auth/me endpoint when user is deleted after token creation."""
         # Create a token for a non-existent user ID
@@ -260,47 +259,13 @@ class TestAuthMe:
         token = create_access_token(subject=fake_user_id)
         
         headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get("/auth/me", headers=headers)
+        response = await client.get("/api/auth/me", headers=headers)
         
         assert response.status_code == 404
         data = response.json()
         assert "error_code" in data
         assert data["error_code"] == "USER_NOT_FOUND"
 
-    async def test_register_empty_email(self, client: AsyncClient):
-        """Test registration with empty email."""
-        user_data = {
-            "email": "",
-            "username": "validusername",
-            "password": "securepassword123",
-            "role": "BUYER"
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        assert response.status_code == 422
-
-    async def test_register_empty_username(self, client: AsyncClient):
-        """Test registration with empty username."""
-        user_data = {
-            "email": "valid@example.com",
-            "username": "",
-            "password": "securepassword123",
-            "role": "BUYER"
-        }
-        
-        response = await client.post("/auth/register", json=user_data)
-        assert response.status_code == 422
-
-    async def test_login_empty_email(self, client: AsyncClient):
-        """Test login with empty email."""
-        login_data = {
-            "email": "",
-            "password": "somepassword"
-        }
-        
-        response = await client.post("/auth/login", json=login_data)
-        assert response.status_code == 422
-
     async def test_login_empty_password(self, client: AsyncClient):
         """Test login with empty password."""
         login_data = {
@@ -308,5 +273,5 @@ class TestAuthMe:
             "password": ""
         }
         
-        response = await client.post("/auth/login", json=login_data)
+        response = await client.post("/api/auth/login", json=login_data)
         assert response.status_code == 401  # Will find user but password validation will fail
@@ -0,0 +1,44 @@
+"""Tests for in-memory TTL cache."""
+from unittest.mock import patch
+
+from app.core.cache import TTLCache, MISSING
+
+
+class TestTTLCache:
+    """Test cases for TTLCache."""
+
+    def test_get_missing_key(self):
+        """Test that unknown keys return MISSING sentinel."""
+        cache = TTLCache(max_size=10, ttl_seconds=30)
+
+        assert cache.get("unknown") is MISSING
+
+    def test_set_and_get_none_value(self):
+        """Test that None is cached as a regular value."""
+        cache = TTLCache(max_size=10, ttl_seconds=30)
+        cache.set("key", None)
+
+        assert cache.get("key") is None
+
+    def test_entry_expires(self):
+        """Test that entries are dropped after TTL."""
+        cache = TTLCache(max_size=10, ttl_seconds=30)
+
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with patch("app.core.cache.time.monotonic", return_value=129.0):
+            assert cache.get("key") == "value"
+        with patch("app.core.cache.time.monotonic", return_value=130.0):
+            assert cache.get("key") is MISSING
+
+    def test_least_recently_used_evicted(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = TTLCache(max_size=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+        assert cache.get("c") == 3
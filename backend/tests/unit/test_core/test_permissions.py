@@ -1,13 +1,23 @@
 """Tests for permission system."""
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.permissions import (
     check_user_permission,
     grant_user_permission,
-    revoke_user_permission
+    revoke_user_permission,
+    permission_cache_scope,
+    get_permission_id,
 )
-from app.core_models import RolePermission, UserPermission
+from app.core_models import Permission, RolePermission, UserPermission
+
+
+async def seed(db: AsyncSession, model: type, *rows: dict) -> None:
+    """Bulk insert setup rows, the test reads them through the same session."""
+    await db.execute(insert(model), list(rows))
 
 
 class TestPermissionSystem:
@@ -22,13 +32,12 @@ class TestPermissionSystem:
         permission = sample_permission
         
         # Grant permission to role
-        role_perm = RolePermission(
+        role_perm = dict(
             role_id=role.id,
             permission_id=permission.id,
             is_active=True
         )
-        db_session.add(role_perm)
-        await db_session.commit()
+        await seed(db_session, RolePermission, role_perm)
         
         # Test permission check
         has_permission = await check_user_permission(
@@ -67,13 +76,12 @@ class TestPermissionSystem:
         permission = sample_permission
         
         # Grant inactive permission to role
-        role_perm = RolePermission(
+        role_perm = dict(
             role_id=role.id,
             permission_id=permission.id,
             is_active=False  # Inactive
         )
-        db_session.add(role_perm)
-        await db_session.commit()
+        await seed(db_session, RolePermission, role_perm)
         
         # Test permission check
         has_permission = await check_user_permission(
@@ -93,21 +101,20 @@ class TestPermissionSystem:
         permission = sample_permission
         
         # Grant INACTIVE permission to role
-        role_perm = RolePermission(
+        role_perm = dict(
             role_id=role.id,
             permission_id=permission.id,
             is_active=False  # Role permission is inactive
         )
-        db_session.add(role_perm)
-        
+
         # Grant ACTIVE permission to user individually
-        user_perm = UserPermission(
+        user_perm = dict(
             user_id=user.id,
             permission_id=permission.id,
             is_active=True  # User permission is active
         )
-        db_session.add(user_perm)
-        await db_session.commit()
+        await seed(db_session, RolePermission, role_perm)
+        await seed(db_session, UserPermission, user_perm)
         
         # Test permission check - should return True because user permission is active
         has_permission = await check_user_permission(
@@ -128,14 +135,13 @@ class TestPermissionSystem:
         business_id = 123
         
         # Grant business-specific permission to user
-        user_perm = UserPermission(
+        user_perm = dict(
             user_id=user.id,
             permission_id=permission.id,
             business_id=business_id,
             is_active=True
         )
-        db_session.add(user_perm)
-        await db_session.commit()
+        await seed(db_session, UserPermission, user_perm)
         
         # Test permission check with matching business_id
         has_permission = await check_user_permission(
@@ -232,6 +238,26 @@ class TestUserPermissionManagement:
         
         assert success is False
 
+    @pytest.mark.asyncio
+    async def test_permission_added_after_catalog_load(
+        self, db_session: AsyncSession, sample_user_with_role
+    ):
+        """Test that a permission missing from the cached catalog is looked up."""
+        user, role = sample_user_with_role
+        await get_permission_id(db_session, "VIEW_DATA")  # Load the catalog
+        await seed(db_session, Permission, {
+            "name": "EXPORT_DATA", "description": "Export data", "resource": "data", "action": "export",
+        })
+
+        success = await grant_user_permission(
+            user_id=user.id,
+            permission_name="EXPORT_DATA",
+            db=db_session
+        )
+
+        assert success is True
+        assert await check_user_permission(user.id, "EXPORT_DATA", db_session) is True
+
     @pytest.mark.asyncio
     async def test_grant_user_permission_business_specific(
         self, db_session: AsyncSession, sample_user_with_role, sample_permission
@@ -269,13 +295,12 @@ class TestUserPermissionManagement:
         permission = sample_permission
         
         # Create inactive user permission
-        user_perm = UserPermission(
+        user_perm = dict(
             user_id=user.id,
             permission_id=permission.id,
             is_active=False
         )
-        db_session.add(user_perm)
-        await db_session.commit()
+        await seed(db_session, UserPermission, user_perm)
         
         # Grant permission (should activate existing)
         success = await grant_user_permission(
@@ -309,30 +334,50 @@ class TestUserPermissionManagement:
             db=db_session
         )
         
-        # Verify it was granted
-        has_permission = await check_user_permission(
-            user_id=user.id,
-            permission_name=permission.name,
-            db=db_session
-        )
-        assert has_permission is True
-        
-        # Now revoke it
-        success = await revoke_user_permission(
-            user_id=user.id,
-            permission_name=permission.name,
-            db=db_session
-        )
-        
-        assert success is True
-        
-        # Verify permission was revoked
-        has_permission = await check_user_permission(
-            user_id=user.id,
-            permission_name=permission.name,
-            db=db_session
-        )
-        assert has_permission is False
+        # Checks within one request are cached, revoking must invalidate them
+        with permission_cache_scope():
+            # Verify it was granted
+            has_permission = await check_user_permission(
+                user_id=user.id,
+                permission_name=permission.name,
+                db=db_session
+            )
+            assert has_permission is True
+            
+            # Now revoke it
+            success = await revoke_user_permission(
+                user_id=user.id,
+                permission_name=permission.name,
+                db=db_session
+            )
+            
+            assert success is True
+            
+            # Verify permission was revoked
+            has_permission = await check_user_permission(
+                user_id=user.id,
+                permission_name=permission.name,
+                db=db_session
+            )
+            assert has_permission is False
+
+    @pytest.mark.asyncio
+    async def test_check_user_permission_cached_within_scope(
+        self, db_session: AsyncSession, sample_user_with_role, sample_permission
+    ):
+        """Test that a repeated check in the same request does not query again."""
+        user, role = sample_user_with_role
+        permission = sample_permission
+
+        with permission_cache_scope():
+            assert await check_user_permission(
+                user_id=user.id, permission_name=permission.name, db=db_session
+            ) is False
+
+            with patch("app.core.permissions._check_user_permission", side_effect=AssertionError("queried again")):
+                assert await check_user_permission(
+                    user_id=user.id, permission_name=permission.name, db=db_session
+                ) is False
 
     @pytest.mark.asyncio
     async def test_revoke_user_permission_nonexistent(
@@ -1,4 +1,7 @@
 """Tests for security module."""
+import datetime
+
+import pytest
 from jose import jwt
 
 from app.core.security import (
@@ -10,37 +13,47 @@ from app.core.security import (
 from app.core.config import settings
 
 
+@pytest.fixture(scope="module")
+def signed_token() -> tuple[str, str]:
+    """Access token with a string subject and the subject, signed once per module."""
+    subject = "test_user_123"
+    return create_access_token(subject=subject), subject
+
+
+@pytest.fixture(scope="module")
+def hashed_password() -> tuple[str, str]:
+    """Password and its hash, hashed once per module."""
+    password = "test_password_123"
+    return password, hash_password(password)
+
+
 class TestSecurity:
     """Test cases for security functions."""
 
-    def test_hash_password(self):
+    def test_hash_password(self, hashed_password: tuple[str, str]):
         """Test password hashing."""
-        password = "test_password_123"
-        hashed = hash_password(password)
+        password, hashed = hashed_password
         
         assert hashed != password
         assert isinstance(hashed, str)
         assert len(hashed) > 0
 
-    def test_verify_password_correct(self):
+    def test_verify_password_correct(self, hashed_password: tuple[str, str]):
         """Test password verification with correct password."""
-        password = "test_password_123"
-        hashed = hash_password(password)
+        password, hashed = hashed_password
         
         assert verify_password(password, hashed) is True
 
-    def test_verify_password_incorrect(self):
+    def test_verify_password_incorrect(self, hashed_password: tuple[str, str]):
         """Test password verification with incorrect password."""
-        password = "test_password_123"
+        _, hashed = hashed_password
         wrong_password = "wrong_password"
-        hashed = hash_password(password)
         
         assert verify_password(wrong_password, hashed) is False
 
-    def test_create_access_token_string_subject(self):
+    def test_create_access_token_string_subject(self, signed_token: tuple[str, str]):
         """Test creating access token with string subject."""
-        subject = "test_user_123"
-        token = create_access_token(subject=subject)
+        token, subject = signed_token
         
         assert isinstance(token, str)
         assert len(token) > 0
@@ -61,10 +74,9 @@ class TestSecurity:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
         assert payload["sub"] == str(subject)
 
-    def test_decode_token_valid(self):
+    def test_decode_token_valid(self, signed_token: tuple[str, str]):
         """Test token decoding with valid token."""
-        subject = "test_user_123"
-        token = create_access_token(subject=subject)
+        token, subject = signed_token
         
         payload = decode_token(token)
         
@@ -75,43 +87,28 @@ class TestSecurity:
         """Test token decoding with invalid token."""
         invalid_token = "invalid.token.here"
         
-        try:
+        with pytest.raises(ValueError, match="Invalid token"):
             decode_token(invalid_token)
-            assert False, "Should have raised ValueError"
-        except ValueError as e:
-            assert "Invalid token" in str(e)
 
     def test_decode_token_expired(self):
         """Test token decoding with expired token."""
         # Create token with negative expiration (expired)
-        import datetime
-        from jose import jwt
-        
         payload = {
             "sub": "test_user",
             "exp": datetime.datetime.utcnow() - datetime.timedelta(hours=1)
         }
         expired_token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
         
-        try:
+        with pytest.raises(ValueError, match="Invalid token"):
             decode_token(expired_token)
-            assert False, "Should have raised ValueError"
-        except ValueError as e:
-            assert "Invalid token" in str(e)
 
-    def test_decode_token_malformed(self):
+    @pytest.mark.parametrize("token", [
+        "not.a.token",
+        "header.payload",  # Missing signature
+        "",
+        "malformed_token_without_dots",
+    ])
+    def test_decode_token_malformed(self, token: str):
         """Test token decoding with malformed token."""
-        malformed_tokens = [
-            "not.a.token",
-            "header.payload",  # Missing signature
-            "",
-            "malformed_token_without_dots"
-        ]
-        
-        for token in malformed_tokens:
-            try:
-                decode_token(token)
-                assert False, f"Token '{token}' should be invalid"
-            except ValueError:
-                pass  # Expected
-            
\ No newline at end of file
+        with pytest.raises(ValueError):
+            decode_token(token)
@@ -11,16 +11,19 @@ Tests the automatic update of inventory balances when:
 import pytest
 from decimal import Decimal
 from datetime import datetime
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import Base
 from app.core_models import User, Business
 from app.expenses.models import (
+    InventoryBalance,
+    Invoice,
+    InvoiceItem,
     InvoiceStatus,
     Supplier,
-    ExpenseSection,
     ExpenseCategory,
     Unit,
-    UnitType,
     MonthPeriod,
     MonthPeriodStatus,
 )
@@ -32,32 +35,18 @@ from app.expenses.schemas import (
 )
 
 
-@pytest.fixture
-async def test_business(db_session: AsyncSession, test_business_owner: User) -> Business:
-    """Create a test business."""
-    business = Business(
-        name="Test Coffee Shop",
-        city="Test City",
-        address="123 Test St",
-        owner_id=test_business_owner.id,
-        is_active=True,
-    )
-    db_session.add(business)
-    await db_session.commit()
-    await db_session.refresh(business)
-    return business
-
-
-@pytest.fixture
-async def test_supplier(
-    db_session: AsyncSession,
-    test_business: Business,
-    test_business_owner: User) -> Supplier:
-    """Create a test supplier."""
+@pytest.fixture(scope="module")
+async def module_invoice_data(
+    module_db_session: AsyncSession,
+    module_business_data: dict[str, Base],
+    module_test_business_owner: User) -> dict[str, Base]:
+    """Create the test supplier and month period once per module, in a single commit."""
+    business = module_business_data["business"]
     supplier = Supplier(
         name="Test Supplier Inc.",
-        business_id=test_business.id,
-        created_by=test_business_owner.id,
+        tax_id="1234567890",
+        business_id=business.id,
+        created_by=module_test_business_owner.id,
         contact_info={
             "phone": "+1234567890",
             "email": "supplier@test.com",
@@ -65,104 +54,54 @@ async def test_supplier(
         },
         is_active=True,
     )
-    db_session.add(supplier)
-    await db_session.commit()
-    await db_session.refresh(supplier)
-    return supplier
-
-
-@pytest.fixture
-async def test_unit(db_session: AsyncSession, test_business: Business) -> Unit:
-    """Create a test unit (kg)."""
-    unit = Unit(
-        name="kilogram",
-        symbol="kg",
-        unit_type=UnitType.WEIGHT,
-        business_id=test_business.id,
+    period = MonthPeriod(
+        name="October 2025",
+        business_id=business.id,
+        year=2025,
+        month=10,
+        status=MonthPeriodStatus.ACTIVE,
         is_active=True,
     )
-    db_session.add(unit)
-    await db_session.commit()
-    await db_session.refresh(unit)
-    return unit
+    rows = {"supplier": supplier, "period": period}
+    module_db_session.add_all(rows.values())
+    await module_db_session.commit()
+    return rows
 
 
 @pytest.fixture
-async def test_unit_gram(db_session: AsyncSession, test_unit: Unit, test_business: Business) -> Unit:
-    """Create a test unit (gram) derived from kg."""
-    unit_gram = Unit(
-        name="gram",
-        symbol="g",
-        unit_type=UnitType.WEIGHT,
-        business_id=test_business.id,
-        base_unit_id=test_unit.id,
-        conversion_factor=Decimal("0.001"),  # 1g = 0.001kg
-        is_active=True,
-    )
-    db_session.add(unit_gram)
-    await db_session.commit()
-    await db_session.refresh(unit_gram)
-    return unit_gram
+async def test_supplier(db_session: AsyncSession, module_invoice_data: dict[str, Base]) -> Supplier:
+    """Test supplier, attached to the test's session."""
+    return await db_session.merge(module_invoice_data["supplier"], load=False)
 
 
 @pytest.fixture
-async def test_section(
-    db_session: AsyncSession,
-    test_business: Business,
-    test_business_owner: User) -> ExpenseSection:
-    """Create a test expense section."""
-    section = ExpenseSection(
-        name="Ingredients",
-        business_id=test_business.id,
-        created_by=test_business_owner.id,
-        order_index=1,
-        is_active=True,
-    )
-    db_session.add(section)
-    await db_session.commit()
-    await db_session.refresh(section)
-    return section
+async def test_period(db_session: AsyncSession, module_invoice_data: dict[str, Base]) -> MonthPeriod:
+    """Test month period, attached to the test's session."""
+    return await db_session.merge(module_invoice_data["period"], load=False)
 
 
-@pytest.fixture
-async def test_category(
-    db_session: AsyncSession,
-    test_business: Business,
-    test_business_owner: User,
-    test_section: ExpenseSection,
-    test_unit: Unit,
-) -> ExpenseCategory:
-    """Create a test expense category."""
-    category = ExpenseCategory(
-        name="Coffee Beans",
-        section_id=test_section.id,
-        business_id=test_business.id,
-        default_unit_id=test_unit.id,
-        created_by=test_business_owner.id,
-        order_index=1,
-        is_active=True,
-    )
-    db_session.add(category)
-    await db_session.commit()
-    await db_session.refresh(category)
-    return category
+async def seed_invoice(db: AsyncSession, invoice: dict, items: list[dict]) -> tuple[int, list[int]]:
+    """
+    Bulk insert an invoice with its items, bypassing the service balance hooks.
+    Returns the invoice ID and IDs of its items.
+    """
+    invoice_id = await db.scalar(insert(Invoice).values(**invoice).returning(Invoice.id))
+    item_ids = (await db.scalars(
+        insert(InvoiceItem).returning(InvoiceItem.id),
+        [dict(item, invoice_id=invoice_id) for item in items],
+    )).all()
+    return invoice_id, list(item_ids)
 
 
-@pytest.fixture
-async def test_period(db_session: AsyncSession, test_business: Business) -> MonthPeriod:
-    """Create a test month period."""
-    period = MonthPeriod(
-        name="October 2025",
-        business_id=test_business.id,
-        year=2025,
-        month=10,
-        status=MonthPeriodStatus.ACTIVE,
-        is_active=True,
-    )
-    db_session.add(period)
-    await db_session.commit()
-    await db_session.refresh(period)
-    return period
+async def seed_balance(db: AsyncSession, category: ExpenseCategory, period: MonthPeriod, purchases: Decimal) -> None:
+    """Insert the balance row the service hooks would have produced for the seeded purchases."""
+    await db.execute(insert(InventoryBalance).values(
+        category_id=category.id,
+        month_period_id=period.id,
+        unit_id=category.default_unit_id,
+        purchases_total=purchases,
+        closing_balance=purchases,
+    ))
 
 
 @pytest.mark.asyncio
@@ -189,7 +128,7 @@ async def test_create_invoice_item_paid_invoice_updates_balance(
     )
     
     invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
+    await db_session.flush()
     
     # Create an invoice item
     item_data = InvoiceItemCreate(
@@ -202,7 +141,7 @@ async def test_create_invoice_item_paid_invoice_updates_balance(
     )
     
     await InvoiceItemService.create_invoice_item(db_session, item_data)
-    await db_session.commit()
+    await db_session.flush()
     
     # Check that inventory balance was created/updated
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -237,7 +176,7 @@ async def test_create_invoice_item_unpaid_invoice_no_balance_update(
     )
     
     invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
+    await db_session.flush()
     
     # Create an invoice item
     item_data = InvoiceItemCreate(
@@ -250,7 +189,7 @@ async def test_create_invoice_item_unpaid_invoice_no_balance_update(
     )
     
     await InvoiceItemService.create_invoice_item(db_session, item_data)
-    await db_session.commit()
+    await db_session.flush()
     
     # Check that inventory balance was NOT created
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -273,36 +212,30 @@ async def test_mark_invoice_as_paid_updates_balance(
     test_period: MonthPeriod,
 ):
     """Test that marking an invoice as PAID updates inventory balance."""
-    # Create an UNPAID invoice with items
-    invoice_data = InvoiceCreate(
-        business_id=test_business.id,
-        supplier_id=test_supplier.id,
-        invoice_number="INV-003",
-        invoice_date=datetime(2025, 10, 15),
-        total_amount=Decimal("750.00"),
-        paid_status=InvoiceStatus.PENDING,
-        document_path=None,
-    )
-    
-    invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
-    
-    # Add items
-    item_data = InvoiceItemCreate(
-        invoice_id=invoice.id,
-        category_id=test_category.id,
-        quantity=Decimal("15.0"),
-        unit_id=test_unit.id,
-        unit_price=Decimal("50.00"),
-        total_price=Decimal("750.00"),
+    # Seed an UNPAID invoice with items, creating them is covered above
+    invoice_id, _ = await seed_invoice(
+        db_session,
+        dict(
+            business_id=test_business.id,
+            supplier_id=test_supplier.id,
+            invoice_number="INV-003",
+            invoice_date=datetime(2025, 10, 15),
+            total_amount=Decimal("750.00"),
+            paid_status=InvoiceStatus.PENDING,
+            created_by=test_business_owner.id,
+        ),
+        [dict(
+            category_id=test_category.id,
+            quantity=Decimal("15.0"),
+            unit_id=test_unit.id,
+            unit_price=Decimal("50.00"),
+            total_price=Decimal("750.00"),
+        )],
     )
     
-    await InvoiceItemService.create_invoice_item(db_session, item_data)
-    await db_session.commit()
-    
     # Mark as paid
-    await InvoiceService.mark_invoice_as_paid(db_session, invoice.id)
-    await db_session.commit()
+    await InvoiceService.mark_invoice_as_paid(db_session, invoice_id)
+    await db_session.flush()
     
     # Check balance
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -324,43 +257,32 @@ async def test_cancel_paid_invoice_updates_balance(
     test_period: MonthPeriod,
 ):
     """Test that cancelling a PAID invoice removes purchases from balance."""
-    # Create a PAID invoice with items
-    invoice_data = InvoiceCreate(
-        business_id=test_business.id,
-        supplier_id=test_supplier.id,
-        invoice_number="INV-004",
-        invoice_date=datetime(2025, 10, 15),
-        total_amount=Decimal("1000.00"),
-        paid_status=InvoiceStatus.PAID,
-        paid_date=datetime(2025, 10, 15),
-        document_path=None,
-    )
-    
-    invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
-    
-    item_data = InvoiceItemCreate(
-        invoice_id=invoice.id,
-        category_id=test_category.id,
-        quantity=Decimal("20.0"),
-        unit_id=test_unit.id,
-        unit_price=Decimal("50.00"),
-        total_price=Decimal("1000.00"),
-    )
-    
-    await InvoiceItemService.create_invoice_item(db_session, item_data)
-    await db_session.commit()
-    
-    # Verify balance has purchases
-    balance = await InventoryBalanceService.get_balance_by_category_and_period(
-        db_session, test_category.id, test_period.id
+    # Seed a PAID invoice with items and the balance holding its purchases
+    invoice_id, _ = await seed_invoice(
+        db_session,
+        dict(
+            business_id=test_business.id,
+            supplier_id=test_supplier.id,
+            invoice_number="INV-004",
+            invoice_date=datetime(2025, 10, 15),
+            total_amount=Decimal("1000.00"),
+            paid_status=InvoiceStatus.PAID,
+            paid_date=datetime(2025, 10, 15),
+            created_by=test_business_owner.id,
+        ),
+        [dict(
+            category_id=test_category.id,
+            quantity=Decimal("20.0"),
+            unit_id=test_unit.id,
+            unit_price=Decimal("50.00"),
+            total_price=Decimal("1000.00"),
+        )],
     )
-    assert balance is not None
-    assert balance.purchases_total == Decimal("20.0")
-    
+    await seed_balance(db_session, test_category, test_period, Decimal("20.0"))
+
     # Cancel invoice
-    await InvoiceService.mark_invoice_as_cancelled(db_session, invoice.id)
-    await db_session.commit()
+    await InvoiceService.mark_invoice_as_cancelled(db_session, invoice_id)
+    await db_session.flush()
     
     # Check balance is now 0
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -395,7 +317,7 @@ async def test_unit_conversion_in_balance(
     )
     
     invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
+    await db_session.flush()
     
     # Add item with 5000 grams (should be 5 kg in balance)
     item_data = InvoiceItemCreate(
@@ -408,7 +330,7 @@ async def test_unit_conversion_in_balance(
     )
     
     await InvoiceItemService.create_invoice_item(db_session, item_data)
-    await db_session.commit()
+    await db_session.flush()
     
     # Check balance (should be in kg)
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -431,54 +353,41 @@ async def test_delete_invoice_item_updates_balance(
     test_period: MonthPeriod,
 ):
     """Test that deleting an invoice item from a PAID invoice updates balance."""
-    # Create a PAID invoice
-    invoice_data = InvoiceCreate(
-        business_id=test_business.id,
-        supplier_id=test_supplier.id,
-        invoice_number="INV-006",
-        invoice_date=datetime(2025, 10, 15),
-        total_amount=Decimal("1250.00"),
-        paid_status=InvoiceStatus.PAID,
-        paid_date=datetime(2025, 10, 15),
-        document_path=None,
-    )
-    
-    invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-    await db_session.commit()
-    
-    # Create two items
-    item1_data = InvoiceItemCreate(
-        invoice_id=invoice.id,
-        category_id=test_category.id,
-        quantity=Decimal("10.0"),
-        unit_id=test_unit.id,
-        unit_price=Decimal("50.00"),
-        total_price=Decimal("500.00"),
-    )
-    
-    item2_data = InvoiceItemCreate(
-        invoice_id=invoice.id,
-        category_id=test_category.id,
-        quantity=Decimal("15.0"),
-        unit_id=test_unit.id,
-        unit_price=Decimal("50.00"),
-        total_price=Decimal("750.00"),
-    )
-    
-    item1 = await InvoiceItemService.create_invoice_item(db_session, item1_data)
-    await InvoiceItemService.create_invoice_item(db_session, item2_data)
-    await db_session.commit()
-    
-    # Verify total is 25
-    balance = await InventoryBalanceService.get_balance_by_category_and_period(
-        db_session, test_category.id, test_period.id
+    # Seed a PAID invoice with two items and the balance holding their purchases (25)
+    _, (item1_id, _) = await seed_invoice(
+        db_session,
+        dict(
+            business_id=test_business.id,
+            supplier_id=test_supplier.id,
+            invoice_number="INV-006",
+            invoice_date=datetime(2025, 10, 15),
+            total_amount=Decimal("1250.00"),
+            paid_status=InvoiceStatus.PAID,
+            paid_date=datetime(2025, 10, 15),
+            created_by=test_business_owner.id,
+        ),
+        [
+            dict(
+                category_id=test_category.id,
+                quantity=Decimal("10.0"),
+                unit_id=test_unit.id,
+                unit_price=Decimal("50.00"),
+                total_price=Decimal("500.00"),
+            ),
+            dict(
+                category_id=test_category.id,
+                quantity=Decimal("15.0"),
+                unit_id=test_unit.id,
+                unit_price=Decimal("50.00"),
+                total_price=Decimal("750.00"),
+            ),
+        ],
     )
-    assert balance is not None
-    assert balance.purchases_total == Decimal("25.0")
-    
+    await seed_balance(db_session, test_category, test_period, Decimal("25.0"))
+
     # Delete first item
-    await InvoiceItemService.delete_invoice_item(db_session, item1.id)
-    await db_session.commit()
+    await InvoiceItemService.delete_invoice_item(db_session, item1_id)
+    await db_session.flush()
     
     # Check balance is now 15
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -499,33 +408,39 @@ async def test_multiple_invoices_aggregate_in_balance(
     test_period: MonthPeriod,
 ):
     """Test that multiple paid invoices correctly aggregate in inventory balance."""
-    # Create multiple PAID invoices
-    for i in range(3):
-        invoice_data = InvoiceCreate(
-            business_id=test_business.id,
-            supplier_id=test_supplier.id,
-            invoice_number=f"INV-MULTI-{i}",
-            invoice_date=datetime(2025, 10, 15),
-            total_amount=Decimal("250.00"),
-            paid_status=InvoiceStatus.PAID,
-            paid_date=datetime(2025, 10, 15),
-            document_path=None,
-        )
-        
-        invoice = await InvoiceService.create_invoice(db_session, invoice_data, test_business_owner.id)
-        
-        item_data = InvoiceItemCreate(
-            invoice_id=invoice.id,
+    # Only the end-state balance matters here, so bulk insert the paid invoices
+    # and their items, then recalculate the balance once
+    invoice_ids = (await db_session.scalars(
+        insert(Invoice).returning(Invoice.id),
+        [
+            dict(
+                business_id=test_business.id,
+                supplier_id=test_supplier.id,
+                invoice_number=f"INV-MULTI-{i}",
+                invoice_date=datetime(2025, 10, 15),
+                total_amount=Decimal("250.00"),
+                paid_status=InvoiceStatus.PAID,
+                paid_date=datetime(2025, 10, 15),
+                created_by=test_business_owner.id,
+            )
+            for i in range(3)
+        ],
+    )).all()
+    await db_session.execute(insert(InvoiceItem), [
+        dict(
+            invoice_id=invoice_id,
             category_id=test_category.id,
             quantity=Decimal("5.0"),
             unit_id=test_unit.id,
             unit_price=Decimal("50.00"),
             total_price=Decimal("250.00"),
         )
-        
-        await InvoiceItemService.create_invoice_item(db_session, item_data)
-    
-    await db_session.commit()
+        for invoice_id in invoice_ids
+    ])
+    await InventoryBalanceService.recalculate_balance_for_category(
+        db_session, test_category.id, test_period.id
+    )
+    await db_session.flush()
     
     # Check balance aggregates all three (3 x 5 = 15)
     balance = await InventoryBalanceService.get_balance_by_category_and_period(
@@ -1,5 +1,6 @@
 """Tests for main FastAPI app."""
 import pytest
+from fastapi.middleware.cors import CORSMiddleware
 from httpx import AsyncClient
 from unittest.mock import patch
 from app.main import app
@@ -9,26 +10,19 @@ class TestMainApp:
     """Test cases for main FastAPI application."""
 
     @pytest.mark.asyncio
-    async def test_health_endpoint(self, client: AsyncClient):
+    async def test_health_endpoint(self, readonly_client: AsyncClient):
         """Test health check endpoint."""
-        response = await client.get("/health")
+        response = await readonly_client.get("/health")
         
         assert response.status_code == 200
         data = response.json()
         assert data == {"status": "ok"}
 
-    @pytest.mark.asyncio 
-    async def test_cors_middleware_allows_origin(self, client: AsyncClient):
+    def test_cors_middleware_allows_origin(self):
         """Test that CORS middleware allows configured origin."""
-        headers = {
-            "Origin": "http://localhost:5173",
-            "Access-Control-Request-Method": "GET"
-        }
-        
-        response = await client.options("/health", headers=headers)
-        
-        # CORS preflight should be handled
-        assert response.status_code == 200
+        cors = next(m for m in app.user_middleware if m.cls is CORSMiddleware)
+
+        assert "http://localhost:5173" in cors.kwargs["allow_origins"]
 
     @pytest.mark.asyncio
     async def test_app_includes_auth_router(self, client: AsyncClient):
@@ -43,9 +37,9 @@ class TestMainApp:
         assert response.status_code == 401
 
     @pytest.mark.asyncio
-    async def test_app_includes_users_router(self, client: AsyncClient):
+    async def test_app_includes_users_router(self, readonly_client: AsyncClient):
         """Test that users routes are included."""
-        response = await client.get("/users/me")
+        response = await readonly_client.get("/users/me")
         
         # Should get 401 (unauthorized), not 404 (which would mean router not included)
         assert response.status_code == 401
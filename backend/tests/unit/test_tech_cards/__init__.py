@@ -0,0 +1 @@
+"""Unit tests for tech cards module."""
@@ -0,0 +1,612 @@
+"""
+Test tech card service loading and cost calculation.
+
+Covers:
+- Query count of list + cost calculation not growing with item count
+- raiseload guarding against hidden lazy loads
+- Ingredient cost calculation with unit conversion
+"""
+# mypy: disable-error-code="arg-type"
+# SQLAlchemy model attributes are typed as Column[T] but after session.refresh() they become T at runtime
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core_models import User, Business
+from app.expenses.models import (
+    Supplier,
+    ExpenseCategory,
+    Unit,
+    UnitType,
+    Invoice,
+    InvoiceItem,
+)
+from app.expenses.unit_service import conversion_factor_cache
+from app.tech_cards.models import IngredientCostHistory
+from app.tech_cards.schemas import (
+    TechCardItemCreate,
+    TechCardItemIngredientCreate,
+    TechCardItemUpdate,
+)
+from app.tech_cards.service import (
+    TechCardService,
+    IngredientCostService,
+    item_cost_cache,
+    average_cost_cache,
+    cost_summary_cache,
+)
+from tests.conftest import test_engine
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the test engine."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(autouse=True)
+def clear_cost_caches():
+    """Drop process-level caches, IDs are reused across test databases."""
+    caches = (item_cost_cache, average_cost_cache, cost_summary_cache, conversion_factor_cache)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+@pytest.fixture
+async def test_cost_history(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit: Unit,
+) -> Invoice:
+    """Create an invoice buying 10 kg for 500 and sync it into cost history."""
+    supplier = Supplier(
+        name="Test Supplier Inc.",
+        tax_id="1234567890",
+        business_id=test_business.id,
+        created_by=test_business_owner.id,
+        is_active=True,
+    )
+    db_session.add(supplier)
+    await db_session.flush()
+
+    invoice = Invoice(
+        business_id=test_business.id,
+        supplier_id=supplier.id,
+        invoice_number="INV-1",
+        invoice_date=datetime(2025, 10, 1),
+        total_amount=Decimal("500.00"),
+        created_by=test_business_owner.id,
+    )
+    db_session.add(invoice)
+    await db_session.flush()
+
+    db_session.add(InvoiceItem(
+        invoice_id=invoice.id,
+        category_id=test_category.id,
+        quantity=Decimal("10"),
+        unit_id=test_unit.id,
+        unit_price=Decimal("50.00"),
+        total_price=Decimal("500.00"),
+    ))
+    await db_session.commit()
+
+    await IngredientCostService.sync_invoice_costs(db_session, invoice.id, test_business.id)
+    return invoice
+
+
+async def create_item(
+    db_session: AsyncSession,
+    business: Business,
+    owner: User,
+    name: str,
+    ingredients: list[TechCardItemIngredientCreate],
+):
+    """Create tech card item with given ingredients."""
+    return await TechCardService.create_tech_card_item(
+        session=db_session,
+        business_id=business.id,
+        user_id=owner.id,
+        item_data=TechCardItemCreate(
+            name=name,
+            selling_price=Decimal("5.00"),
+            ingredients=ingredients,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_calculate_item_cost_converts_units(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that cost of 18 g is derived from price per kg."""
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+
+    cost = await TechCardService.calculate_item_cost(
+        session=db_session,
+        item_id=item.id,
+        business_id=test_business.id,
+    )
+
+    assert cost == Decimal("0.9")  # 500 / 10 kg = 0.05 per g
+
+
+@pytest.mark.asyncio
+async def test_cached_costs_cost_one_version_query(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that a cache hit only reads the cost data version."""
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+    await TechCardService.calculate_items_costs(
+        session=db_session, items=[item], business_id=test_business.id
+    )
+    await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit_gram.id,
+    )
+
+    with count_queries() as statements:
+        costs = await TechCardService.calculate_items_costs(
+            session=db_session, items=[item], business_id=test_business.id
+        )
+    assert costs == {item.id: Decimal("0.9")}
+    assert len(statements) == 1
+
+    with count_queries() as statements:
+        cost = await IngredientCostService.get_ingredient_average_cost(
+            session=db_session,
+            business_id=test_business.id,
+            category_id=test_category.id,
+            target_unit_id=test_unit_gram.id,
+        )
+    assert cost == Decimal("0.05")
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_item_cost_follows_cost_history(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that cached item cost is dropped when cost history changes without invalidation."""
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+    assert await TechCardService.calculate_item_cost(
+        session=db_session, item_id=item.id, business_id=test_business.id, item=item
+    ) == Decimal("0.9")
+
+    # As the FK cascade of an invoice deletion (or another worker) does it
+    await db_session.execute(
+        delete(IngredientCostHistory).where(IngredientCostHistory.invoice_id == test_cost_history.id)
+    )
+
+    assert await TechCardService.calculate_item_cost(
+        session=db_session, item_id=item.id, business_id=test_business.id, item=item
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_cached_item_cost_follows_unit_edits(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit: Unit,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that cached conversions are not reused after a unit's factor changes."""
+    # Fixture units hold unit_type as the enum, reloaded ones the stored value
+    await db_session.refresh(test_unit)
+    await db_session.refresh(test_unit_gram)
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+    assert await TechCardService.calculate_item_cost(
+        session=db_session, item_id=item.id, business_id=test_business.id, item=item
+    ) == Decimal("0.9")
+
+    # As another worker process does it, without touching this process's caches
+    await db_session.execute(
+        update(Unit).where(Unit.id == test_unit_gram.id).values(conversion_factor=Decimal("0.002"))
+    )
+
+    assert await TechCardService.calculate_item_cost(
+        session=db_session, item_id=item.id, business_id=test_business.id, item=item
+    ) == Decimal("1.8")  # 500 / 5000 units of 2 g
+
+
+@pytest.mark.asyncio
+async def test_calculate_item_cost_without_history(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit: Unit,
+):
+    """Test that cost is unknown when an ingredient has no purchases."""
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("0.018"),
+            unit_id=test_unit.id,
+        )],
+    )
+
+    cost = await TechCardService.calculate_item_cost(
+        session=db_session,
+        item_id=item.id,
+        business_id=test_business.id,
+    )
+
+    assert cost is None
+
+
+@pytest.mark.asyncio
+async def test_get_item_raises_on_lazy_load(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+):
+    """Test that relationships not loaded explicitly raise instead of querying."""
+    created = await create_item(db_session, test_business, test_business_owner, "Espresso", [])
+    db_session.expunge_all()
+
+    item = await TechCardService.get_tech_card_item(
+        session=db_session,
+        item_id=created.id,
+        business_id=test_business.id,
+    )
+
+    assert item is not None
+    assert item.ingredients == []
+    with pytest.raises(InvalidRequestError):
+        _ = item.business
+
+
+@pytest.mark.asyncio
+async def test_list_query_count_does_not_grow_with_items(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that listing items with costs runs a constant number of queries."""
+    ingredients = [TechCardItemIngredientCreate(
+        ingredient_category_id=test_category.id,
+        quantity=Decimal("18"),
+        unit_id=test_unit_gram.id,
+    )]
+
+    async def list_with_costs() -> int:
+        item_cost_cache.clear()
+        conversion_factor_cache.clear()
+        db_session.expunge_all()
+        with count_queries() as statements:
+            items, _ = await TechCardService.list_tech_card_items(
+                session=db_session,
+                business_id=test_business.id,
+            )
+            costs = await TechCardService.calculate_items_costs(
+                session=db_session,
+                items=items,
+                business_id=test_business.id,
+            )
+        assert all(cost == Decimal("0.9") for cost in costs.values())
+        return len(statements)
+
+    await create_item(db_session, test_business, test_business_owner, "Espresso", ingredients)
+    single_item_queries = await list_with_costs()
+
+    for name in ("Americano", "Latte", "Cappuccino"):
+        await create_item(db_session, test_business, test_business_owner, name, ingredients)
+    many_items_queries = await list_with_costs()
+
+    assert many_items_queries == single_item_queries
+
+
+@pytest.mark.asyncio
+async def test_cached_conversions_skip_units_query(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that units are loaded only when a needed conversion is not cached."""
+    item = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+
+    async def cost_queries() -> list[str]:
+        item_cost_cache.clear()
+        with count_queries() as statements:
+            costs = await TechCardService.calculate_items_costs(
+                session=db_session, items=[item], business_id=test_business.id
+            )
+        assert costs == {item.id: Decimal("0.9")}
+        return statements
+
+    uncached = await cost_queries()
+    cached = await cost_queries()
+
+    assert any(statement.lstrip().startswith("SELECT units.") for statement in uncached)
+    assert not any(statement.lstrip().startswith("SELECT units.") for statement in cached)
+
+
+@pytest.mark.asyncio
+async def test_get_ingredient_average_cost(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that average cost is returned per requested unit."""
+    cost = await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit_gram.id,
+    )
+
+    assert cost == Decimal("0.05")
+
+
+@pytest.mark.asyncio
+async def test_get_ingredient_average_cost_same_unit(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_category: ExpenseCategory,
+    test_unit: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that average cost in the purchase unit needs no conversion."""
+    cost = await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit.id,
+    )
+
+    assert cost == Decimal("50")
+
+
+@pytest.mark.asyncio
+async def test_ingredient_cost_summary_invalidated_on_sync(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_category: ExpenseCategory,
+    test_cost_history: Invoice,
+):
+    """Test that cached cost summary is refreshed after invoice costs are synced."""
+    summary = await IngredientCostService.get_ingredient_cost_summary(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+    )
+    assert summary is not None
+    assert summary.average_cost_per_base_unit == Decimal("50")
+
+    with count_queries() as statements:
+        await IngredientCostService.get_ingredient_cost_summary(
+            session=db_session,
+            business_id=test_business.id,
+            category_id=test_category.id,
+        )
+    assert len(statements) == 1  # Only the cost data version is read
+
+    invoice_item = (await db_session.execute(
+        select(InvoiceItem).where(InvoiceItem.invoice_id == test_cost_history.id)
+    )).scalar_one()
+    invoice_item.total_price = Decimal("600.00")
+    await db_session.commit()
+    await IngredientCostService.sync_invoice_costs(
+        db_session, test_cost_history.id, test_business.id
+    )
+
+    summary = await IngredientCostService.get_ingredient_cost_summary(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+    )
+    assert summary is not None
+    assert summary.average_cost_per_base_unit == Decimal("60")
+
+
+@pytest.mark.asyncio
+async def test_cached_ingredient_costs_follow_cost_history(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that cached average cost and summary are dropped when cost history is deleted."""
+    assert await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit_gram.id,
+    ) == Decimal("0.05")
+    assert await IngredientCostService.get_ingredient_cost_summary(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+    ) is not None
+
+    # As the FK cascade of an invoice deletion (or another worker) does it
+    await db_session.execute(
+        delete(IngredientCostHistory).where(IngredientCostHistory.invoice_id == test_cost_history.id)
+    )
+
+    assert await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit_gram.id,
+    ) is None
+    assert await IngredientCostService.get_ingredient_cost_summary(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_update_item_replaces_ingredients_in_memory(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit: Unit,
+    test_unit_gram: Unit,
+):
+    """Test that updated item returns its new ingredients without reloading."""
+    created = await create_item(
+        db_session, test_business, test_business_owner, "Espresso",
+        [TechCardItemIngredientCreate(
+            ingredient_category_id=test_category.id,
+            quantity=Decimal("18"),
+            unit_id=test_unit_gram.id,
+        )],
+    )
+    assert [ingredient.id for ingredient in created.ingredients] != [None]
+
+    with count_queries() as statements:
+        item = await TechCardService.update_tech_card_item(
+            session=db_session,
+            item_id=created.id,
+            business_id=test_business.id,
+            update_data=TechCardItemUpdate(ingredients=[TechCardItemIngredientCreate(
+                ingredient_category_id=test_category.id,
+                quantity=Decimal("0.02"),
+                unit_id=test_unit.id,
+            )]),
+        )
+        assert item is not None
+        assert [(ingredient.quantity, ingredient.unit_id) for ingredient in item.ingredients] == [
+            (Decimal("0.02"), test_unit.id)
+        ]
+    # Item comes from the identity map and new ingredients are kept in memory
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+@pytest.mark.asyncio
+async def test_get_ingredient_average_cost_skips_other_unit_types(
+    db_session: AsyncSession,
+    test_business: Business,
+    test_business_owner: User,
+    test_category: ExpenseCategory,
+    test_unit_gram: Unit,
+    test_cost_history: Invoice,
+):
+    """Test that newer purchases in units of another type are ignored."""
+    piece = Unit(
+        name="piece",
+        symbol="pcs",
+        unit_type=UnitType.COUNT,
+        business_id=test_business.id,
+        is_active=True,
+    )
+    db_session.add(piece)
+    await db_session.flush()
+
+    for day in range(2, 6):
+        invoice = Invoice(
+            business_id=test_business.id,
+            supplier_id=test_cost_history.supplier_id,
+            invoice_number=f"INV-{day}",
+            invoice_date=datetime(2025, 10, day),
+            total_amount=Decimal("30.00"),
+            created_by=test_business_owner.id,
+        )
+        db_session.add(invoice)
+        await db_session.flush()
+        db_session.add(InvoiceItem(
+            invoice_id=invoice.id,
+            category_id=test_category.id,
+            quantity=Decimal("3"),
+            unit_id=piece.id,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("30.00"),
+        ))
+        await db_session.commit()
+        await IngredientCostService.sync_invoice_costs(db_session, invoice.id, test_business.id)
+
+    cost = await IngredientCostService.get_ingredient_average_cost(
+        session=db_session,
+        business_id=test_business.id,
+        category_id=test_category.id,
+        target_unit_id=test_unit_gram.id,
+    )
+
+    assert cost == Decimal("0.05")
@@ -2,39 +2,82 @@
 import subprocess
 import collections
 import argparse
-from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterator, List, Dict, Any, Tuple, Optional
 
 SESSION_GAP = 4 * 60 * 60       # 4 hours
 SESSION_BASE = 60 * 60          # base 60 min for session start
+NUMSTAT_CACHE_FILE = 'git_time_numstat.sqlite'  # kept in the git dir, commits are immutable
+COMMITS_CACHE_FILE = 'git_time_commits.json'    # last full commit list, keyed on the refs it was read from
 
+@lru_cache(maxsize=8192)
 def fmt(ts: int) -> str:
-    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+    t = time.localtime(ts)
+    return f'{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}'
 
-def run_git(args: List[str]) -> str:
-    return subprocess.check_output(args, text=True)
+def iter_git_records(
+    args: List[str], sep: bytes = b'\n', chunk_size: int = 64 * 1024, stdin: Optional[bytes] = None
+) -> Iterator[bytes]:
+    """
+    Yield raw git output records split on `sep`, as they are produced; raise if git fails.
+    Output is read in blocks; callers decode only the fields they keep. `stdin` is written to git first.
+    """
+    with subprocess.Popen(args, stdin=None if stdin is None else subprocess.PIPE, stdout=subprocess.PIPE) as proc:
+        assert proc.stdout is not None
+        if stdin is not None:
+            assert proc.stdin is not None
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+        tail = b''
+        while True:
+            chunk = proc.stdout.read1(chunk_size)
+            if not chunk:
+                break
+            records = (tail + chunk).split(sep)
+            tail = records.pop()
+            yield from records
+        if tail:
+            yield tail
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, args)
 
 def get_commits(since: Optional[str], until: Optional[str], author_filter: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
-    git_args = ['git', 'log', '--all', '--pretty=format:%H|%at|%an|%ae|%s']
+    # -z: NUL between commits, so record framing never depends on subject contents
+    git_args = ['git', 'log', '--all', '-z', '--pretty=format:%H|%at|%an|%ae|%s']
     if since:
         git_args.append(f'--since={since}')
     if until:
         git_args.append(f'--until={until}')
+    if author_filter:
+        # Let git drop other authors early; it matches "name <email>", so the
+        # email-only match below still decides
+        git_args += [f'--author={author_filter}', '--fixed-strings', '--regexp-ignore-case']
 
-    lines = run_git(git_args).strip().splitlines()
     by_author: Dict[str, List[Dict[str, Any]]] = collections.defaultdict(list)
-    for line in lines:
-        parts = line.split('|', 4)
+    author_filter_lower = author_filter.lower() if author_filter else None
+    emails: Dict[bytes, Optional[str]] = {}  # raw email -> decoded, None if filtered out
+    for record in iter_git_records(git_args, sep=b'\x00'):
+        parts = record.split(b'|', 4)
         if len(parts) < 5:
             continue
-        h, ts, an, ae, subj = parts
-        if author_filter and author_filter.lower() not in ae.lower():
+        h, ts, an, ae_raw, subj = parts
+        if ae_raw in emails:
+            ae = emails[ae_raw]
+        else:
+            ae = emails[ae_raw] = ae_raw.decode('utf-8', 'replace')
+            if author_filter_lower and author_filter_lower not in ae.lower():
+                ae = emails[ae_raw] = None
+        if ae is None or not ts.isdigit():
             continue
-        try:
-            ts_i = int(ts)
-        except ValueError:
-            continue
-        by_author[ae].append({'hash': h, 'ts': ts_i, 'name': an, 'email': ae, 'subject': subj})
+        by_author[ae].append({'hash': h.decode(), 'ts': int(ts), 'name': an.decode('utf-8', 'replace'),
+                              'email': ae, 'subject': subj.decode('utf-8', 'replace')})
     for ae in by_author:
         by_author[ae].sort(key=lambda c: c['ts'])
     return by_author
@@ -44,45 +87,143 @@ def build_sessions(commits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not commits:
         return sessions
 
-    sess_start_idx = 0
-    for i in range(1, len(commits)):
-        if commits[i]['ts'] - commits[i-1]['ts'] > SESSION_GAP:
-            start_ts = commits[sess_start_idx]['ts']
-            end_ts = commits[i-1]['ts']
-            duration = SESSION_BASE + max(0, end_ts - start_ts)
-            sessions.append({'start_ts': start_ts, 'end_ts': end_ts, 'duration_sec': duration,
-                             'commits': commits[sess_start_idx:i]})
-            sess_start_idx = i
-
-    start_ts = commits[sess_start_idx]['ts']
-    end_ts = commits[-1]['ts']
-    duration = SESSION_BASE + max(0, end_ts - start_ts)
-    sessions.append({'start_ts': start_ts, 'end_ts': end_ts, 'duration_sec': duration,
-                     'commits': commits[sess_start_idx:]})
+    # Session boundaries from one pass over the timestamps, then one slice per session
+    ts = [c['ts'] for c in commits]
+    breaks = [i for i, (prev, curr) in enumerate(zip(ts, ts[1:]), 1) if curr - prev > SESSION_GAP]
+    for first, stop in zip([0, *breaks], [*breaks, len(ts)]):
+        start_ts, end_ts = ts[first], ts[stop - 1]
+        duration = SESSION_BASE + max(0, end_ts - start_ts)
+        sessions.append({'start_ts': start_ts, 'end_ts': end_ts, 'duration_sec': duration,
+                         'commits': commits[first:stop]})
     return sessions
 
-def numstat_between(prev_hash: Optional[str], curr_hash: str) -> Tuple[int, int]:
-    if prev_hash:
-        args = ['git', 'diff', '--numstat', prev_hash, curr_hash]
-    else:
-        args = ['git', 'diff', '--numstat', f'{curr_hash}^', curr_hash]
+COMMIT_MARKER = b'\x1e'           # starts each commit header in get_numstats output
 
-    try:
-        out = run_git(args)
-    except subprocess.CalledProcessError:
-        return (0, 0)
+def get_numstats(hashes: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Lines (added, removed) of the given commits, parsed from a single streamed `git log --numstat`."""
+    numstats: Dict[str, Tuple[int, int]] = {}
+    if not hashes:
+        return numstats
 
+    # -z: NUL-terminated entries with paths verbatim, so tabs or newlines in file names cannot
+    # be mistaken for stats. A rename leaves the path empty, its old and new paths follow as
+    # two more entries.
+    git_args = ['git', 'log', '--no-walk=unsorted', '--stdin', '-z', '--numstat', '--pretty=format:%x1e%H']
+    curr_hash: Optional[bytes] = None
     added, removed = 0, 0
-    for line in out.strip().splitlines():
-        parts = line.split('\t')
-        if len(parts) < 3:
+    skip_paths = 0
+    for entry in iter_git_records(git_args, sep=b'\0', stdin='\n'.join(hashes).encode() + b'\n'):
+        if skip_paths:
+            skip_paths -= 1
+            continue
+        if entry.startswith(COMMIT_MARKER):
+            if curr_hash:
+                numstats[curr_hash.decode()] = (added, removed)
+            curr_hash, _, entry = entry[1:].partition(b'\n')  # first stats entry follows the header
+            added, removed = 0, 0
+        if not entry:
             continue
-        a, r, _ = parts
+        a, r, path = entry.split(b'\t', 2)  # path bytes are never decoded
+        if not path:
+            skip_paths = 2
         if a.isdigit():
             added += int(a)
         if r.isdigit():
             removed += int(r)
-    return (added, removed)
+    if curr_hash:
+        numstats[curr_hash.decode()] = (added, removed)
+    return numstats
+
+@lru_cache(maxsize=None)
+def git_common_dir() -> str:
+    return subprocess.check_output(['git', 'rev-parse', '--git-common-dir'], text=True).strip()
+
+def numstat_cache_path() -> str:
+    return os.path.join(git_common_dir(), NUMSTAT_CACHE_FILE)
+
+def load_numstat_cache(path: str) -> Dict[str, Tuple[int, int]]:
+    with closing(sqlite3.connect(path)) as db:
+        db.execute('CREATE TABLE IF NOT EXISTS numstat (hash TEXT PRIMARY KEY, a INT, r INT)')
+        return {h: (a, r) for h, a, r in db.execute('SELECT hash, a, r FROM numstat')}
+
+def save_numstat_cache(path: str, numstats: Dict[str, Tuple[int, int]]) -> None:
+    with closing(sqlite3.connect(path)) as db, db:
+        db.executemany('INSERT OR REPLACE INTO numstat (hash, a, r) VALUES (?, ?, ?)',
+                       ((h, a, r) for h, (a, r) in numstats.items()))
+
+def get_cached_numstats(hashes: List[str], use_cache: bool = True) -> Dict[str, Tuple[int, int]]:
+    """Numstats of the given commits; only commits missing from the on-disk cache are asked from git."""
+    if not use_cache:
+        return get_numstats(hashes)
+    path = numstat_cache_path()
+    numstats = load_numstat_cache(path)
+    missing = get_numstats([h for h in hashes if h not in numstats])
+    if missing:
+        save_numstat_cache(path, missing)
+        numstats.update(missing)
+    return numstats
+
+def get_cached_commits(
+    since: Optional[str], until: Optional[str], author_filter: Optional[str], use_cache: bool = True
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    get_commits() reusing the previous run's result while no ref has moved.
+    Date-bounded runs are not cached: git resolves --since/--until against the current time.
+    """
+    if since or until or not use_cache:
+        return get_commits(since, until, author_filter)
+
+    try:
+        refs = subprocess.check_output(['git', 'show-ref', '--head'], stderr=subprocess.DEVNULL)
+    except subprocess.CalledProcessError:
+        # No refs to key the cache on (e.g. a repository without commits)
+        return get_commits(since, until, author_filter)
+    key = hashlib.sha1(refs + f'\0{author_filter or ""}'.encode()).hexdigest()
+    path = os.path.join(git_common_dir(), COMMITS_CACHE_FILE)
+    try:
+        with open(path, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['key'] == key:
+            return cached['by_author']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    by_author = get_commits(since, until, author_filter)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'by_author': by_author}, f)
+    return by_author
+
+def print_session(
+    by_author: Dict[str, List[Dict[str, Any]]], author: Optional[str], idx: int, use_cache: bool = True
+) -> None:
+    """Print one session of one author; only that author's sessions and commit numstats are computed."""
+    if not author:
+        print("ERROR: --session requires --author to select whose sessions to show.")
+        return
+    matched = list(by_author)  # get_commits already kept only emails matching the author
+    if not matched:
+        print(f"No author matched by '{author}'.")
+        return
+    if len(matched) > 1:
+        print(f"Ambiguous --author. Matched: {', '.join(matched)}")
+        return
+
+    key = matched[0]
+    sessions = build_sessions(by_author[key])
+    if idx < 1 or idx > len(sessions):
+        print(f"Session index out of range. Author '{key}' has {len(sessions)} session(s).")
+        return
+
+    sess = sessions[idx - 1]
+    numstats = get_cached_numstats([c['hash'] for c in sess['commits']], use_cache)
+    print(f"Author: {key}")
+    print(f"Session {idx:02d}: {fmt(sess['start_ts'])}  ->  {fmt(sess['end_ts'])}   "
+          f"duration: {round(sess['duration_sec']/3600, 2)} h")
+    lines = ["\nCommits in this session (chronological):"]
+    for c in sess['commits']:
+        add, rem = numstats.get(c['hash'], (0, 0))
+        lines.append(f"- {fmt(c['ts'])} | {c['name']} <{c['email']}> | {c['hash'][:10]} | +{add} -{rem} | {c['subject']}")
+    print('\n'.join(lines))
 
 def main():
     parser = argparse.ArgumentParser(
@@ -99,7 +240,12 @@ def main():
             "  python3 git_time.py --since 2025-09-01 --until 2025-10-01\n"
             "  python3 git_time.py --author vladimir --list-commits\n"
             "  python3 git_time.py --author vladimir@example.com --session 2\n"
-            "  python3 git_time.py --no-sessions   # hide sessions section"
+            "  python3 git_time.py --no-sessions   # hide sessions section\n"
+            "  python3 git_time.py --no-cache      # recompute everything from git\n"
+            "\n"
+            "Cache files (in the git directory, safe to delete):\n"
+            f"  {COMMITS_CACHE_FILE:24s} commit list of the last undated run, reused while no ref moves\n"
+            f"  {NUMSTAT_CACHE_FILE:24s} added/removed line counts per commit hash"
         )
     )
     parser.add_argument("--author", type=str, help="Filter by author email (substring match).")
@@ -108,13 +254,24 @@ def main():
     parser.add_argument("--list-commits", action="store_true",
                         help="Print per-commit details for each session (for selected author/all).")
     parser.add_argument("--session", type=int,
-                        help="Show only a single session (index starting at 1) for the selected --author.")
+                        help="Show only a single session (index starting at 1) for the selected --author.\n"
+                             "Totals are skipped, only that author's sessions are computed.")
     parser.add_argument("--no-sessions", action="store_true",
                         help="Do not print the sessions section (boundaries).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Neither read nor write the cache files in the git directory.")
 
     args = parser.parse_args()
 
-    by_author = get_commits(args.since, args.until, args.author)
+    use_cache = not args.no_cache
+    by_author = get_cached_commits(args.since, args.until, args.author, use_cache)
+    if args.session is not None:
+        print_session(by_author, args.author, args.session, use_cache)
+        return
+
+    numstats: Dict[str, Tuple[int, int]] = {}
+    if args.list_commits:
+        numstats = get_cached_numstats([c['hash'] for commits in by_author.values() for c in commits], use_cache)
 
     total = 0
     per_author_seconds = {}
@@ -131,59 +288,29 @@ def main():
     print("TOTAL person-days (8h):", round(total / 3600 / 8, 2))
 
     print("\nBy author (hours):")
-    for ae, sec in sorted(per_author_seconds.items(), key=lambda x: -x[1]):
-        print(f"{ae:30s} {round(sec / 3600, 2)}")
-
-    if args.session is not None:
-        if not args.author:
-            print("\nERROR: --session requires --author to select whose sessions to show.")
-            return
-        matched = [k for k in per_author_sessions if args.author.lower() in k.lower()]
-        if not matched:
-            print(f"\nNo author matched by '{args.author}'.")
-            return
-        if len(matched) > 1:
-            print(f"\nAmbiguous --author. Matched: {', '.join(matched)}")
-            return
-
-        key = matched[0]
-        sessions = per_author_sessions.get(key, [])
-        idx = args.session
-        if idx < 1 or idx > len(sessions):
-            print(f"\nSession index out of range. Author '{key}' has {len(sessions)} session(s).")
-            return
-
-        sess = sessions[idx - 1]
-        print(f"\nAuthor: {key}")
-        print(f"Session {idx:02d}: {fmt(sess['start_ts'])}  ->  {fmt(sess['end_ts'])}   "
-              f"duration: {round(sess['duration_sec']/3600, 2)} h")
-        print("\nCommits in this session (chronological):")
-        prev_hash = None
-        for c in sess['commits']:
-            add, rem = numstat_between(prev_hash, c['hash'])
-            print(f"- {fmt(c['ts'])} | {c['name']} <{c['email']}> | {c['hash'][:10]} | +{add} -{rem} | {c['subject']}")
-            prev_hash = c['hash']
-        return
+    table = [f"{ae:30s} {round(sec / 3600, 2)}"
+             for ae, sec in sorted(per_author_seconds.items(), key=itemgetter(1), reverse=True)]
+    if table:
+        print('\n'.join(table))
 
     if not args.no_sessions:
         print("\nSession boundaries per author:")
         keys = sorted(per_author_sessions.keys())
-        if args.author:
-            keys = [k for k in keys if args.author.lower() in k.lower()]
 
         for ae in keys:
             sessions = per_author_sessions[ae]
             if not sessions:
                 continue
-            print(f"\n{ae}")
+            # One write per author instead of one print per line
+            lines = [f"\n{ae}"]
             for i, s in enumerate(sessions, 1):
-                print(f"  Session {i:02d}: {fmt(s['start_ts'])}  →  {fmt(s['end_ts'])}   "
-                      f"duration: {round(s['duration_sec']/3600, 2)} h")
+                lines.append(f"  Session {i:02d}: {fmt(s['start_ts'])}  →  {fmt(s['end_ts'])}   "
+                             f"duration: {round(s['duration_sec']/3600, 2)} h")
                 if args.list_commits:
-                    for c_idx, c in enumerate(s['commits']):
-                        prev_hash = None if c_idx == 0 else s['commits'][c_idx-1]['hash']
-                        add, rem = numstat_between(prev_hash, c['hash'])
-                        print(f"    • {fmt(c['ts'])} | {c['name']} <{c['email']}> | {c['hash'][:10]} | +{add} -{rem} | {c['subject']}")
+                    for c in s['commits']:
+                        add, rem = numstats.get(c['hash'], (0, 0))
+                        lines.append(f"    • {fmt(c['ts'])} | {c['name']} <{c['email']}> | {c['hash'][:10]} | +{add} -{rem} | {c['subject']}")
+            print('\n'.join(lines))
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,7 @@ import { useTranslation } from 'react-i18next';
 import { PlusIcon, PencilIcon, TrashIcon, CheckIcon } from '@heroicons/react/24/outline';
 import { useAppContext } from '~/shared/context/AppContext';
 import { Protected, Input } from '~/shared/ui';
-import { techCardsApi, type TechCardItem } from '~/shared/api/techCardsApi';
+import { techCardsApi, type TechCardItem, type TechCardItemListRow } from '~/shared/api/techCardsApi';
 import TechCardModal from '~/components/modals/TechCardModal';
 import ConfirmModal from '~/components/modals/ConfirmModal';
 import { formatCurrency } from '~/shared/lib/helpers';
@@ -14,7 +14,7 @@ export default function TechCards() {
   const { currentLocation } = useAppContext();
 
   // State
-  const [items, setItems] = useState<TechCardItem[]>([]);
+  const [items, setItems] = useState<TechCardItemListRow[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -85,19 +85,26 @@ export default function TechCards() {
     setIsModalOpen(true);
   };
 
-  const handleEdit = (item: TechCardItem) => {
-    setSelectedItem(item);
-    setModalMode('edit');
-    setIsModalOpen(true);
-  };
+  const openItemModal = async (item: TechCardItemListRow, mode: 'edit' | 'view') => {
+    if (!currentLocation?.id) return;
 
-  const handleView = (item: TechCardItem) => {
-    setSelectedItem(item);
-    setModalMode('view');
-    setIsModalOpen(true);
+    try {
+      // List rows carry no ingredients, so load the full recipe first
+      const fullItem = await techCardsApi.getItem(currentLocation.id, item.id);
+      setSelectedItem(fullItem);
+      setModalMode(mode);
+      setIsModalOpen(true);
+    } catch (err) {
+      console.error('Failed to load tech card:', err);
+      setError(t('common.error'));
+    }
   };
 
-  const handleDelete = async (item: TechCardItem) => {
+  const handleEdit = (item: TechCardItemListRow) => openItemModal(item, 'edit');
+
+  const handleView = (item: TechCardItemListRow) => openItemModal(item, 'view');
+
+  const handleDelete = async (item: TechCardItemListRow) => {
     if (!currentLocation?.id) return;
     
     setConfirmModal({
@@ -119,7 +126,7 @@ export default function TechCards() {
     });
   };
 
-  const handleApprove = async (item: TechCardItem, status: 'approved' | 'rejected') => {
+  const handleApprove = async (item: TechCardItemListRow, status: 'approved' | 'rejected') => {
     if (!currentLocation?.id) return;
     
     const isApprove = status === 'approved';
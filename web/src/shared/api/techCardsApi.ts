@@ -28,6 +28,9 @@ export interface TechCardItem {
   category_name?: string;
 }
 
+// List rows omit ingredients; fetch the item via getItem for the full recipe
+export type TechCardItemListRow = Omit<TechCardItem, 'ingredients'>;
+
 export interface TechCardItemCreate {
   name: string;
   description?: string;
@@ -45,7 +48,7 @@ export interface TechCardItemUpdate {
 }
 
 export interface TechCardItemListResponse {
-  items: TechCardItem[];
+  items: TechCardItemListRow[];
   total: number;
   page: number;
   page_size: number;